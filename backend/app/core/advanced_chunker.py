@@ -16,6 +16,8 @@ import uuid
 import math
 import asyncio
 import time
+import bisect
+from functools import lru_cache
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 from app.schemas import LeaseType
@@ -31,6 +33,48 @@ except ImportError:
     BYPASS_GPT_FOR_DEBUG = False
     VERBOSE_LOGGING = False
 
+# Heading patterns for building the AST, compiled once at import as
+# (pattern, level) pairs
+HEADING_PATTERNS = [(re.compile(pattern, re.MULTILINE), level) for pattern, level in [
+    # Article level
+    (r'(?:^|\n)\s*((?:ARTICLE|Article)\s+[IVXLCDM]+[:.]\s*[^\n]{3,})(?:\n|$)', 1),
+    (r'(?:^|\n)\s*((?:ARTICLE|Article)\s+\d+[:.]\s*[^\n]{3,})(?:\n|$)', 1),
+    
+    # Section level
+    (r'(?:^|\n)\s*((?:SECTION|Section)\s+\d+(?:\.\d+)?[:.]\s*[^\n]{3,})(?:\n|$)', 2),
+    (r'(?:^|\n)\s*(\d+\.\d+\s+[A-Z][^\n]{3,})(?:\n|$)', 2),
+    
+    # Subsection level
+    (r'(?:^|\n)\s*((?:SECTION|Section)\s+\d+(?:\.\d+)?[\(\[][a-z0-9]+[\)\]][:.]\s*[^\n]{3,})(?:\n|$)', 3),
+    (r'(?:^|\n)\s*(\d+\.\d+[\(\[][a-z0-9]+[\)\]]\s+[A-Z][^\n]{3,})(?:\n|$)', 3),
+    
+    # General numbered/lettered subsections
+    (r'(?:^|\n)\s*([\(\[][a-z0-9]+[\)\]]\s+[A-Z][^\n]{3,})(?:\n|$)', 3),
+    
+    # ALL CAPS headings (common in leases)
+    (r'(?:^|\n)\s*([A-Z][A-Z\s\d.,:;(){}_-]{8,}[A-Z])(?:\n|$)', 2),
+]]
+
+# Page marker patterns
+PAGE_MARKER_PATTERNS = [
+    re.compile(r"---\s*PAGE\s*(\d+)\s*---", re.MULTILINE),
+    re.compile(r"(?:^|\n)\s*Page\s+(\d+)\s*(?:$|\n)", re.MULTILINE),
+]
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """The cl100k_base tokenizer, loaded once; None if tiktoken is unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, approximating token counts: {e}")
+        return None
+
 
 @dataclass
 class ClauseNode:
@@ -44,6 +88,7 @@ class ClauseNode:
     children: List['ClauseNode'] = None
     page_start: Optional[int] = None
     page_end: Optional[int] = None
+    token_estimate: Optional[int] = None
     
     def __post_init__(self):
         if self.children is None:
@@ -102,25 +147,7 @@ class RecursiveGPTChunker:
         }
         
         # Heading patterns for building AST
-        self.heading_patterns = [
-            # Article level
-            (r'(?:^|\n)\s*((?:ARTICLE|Article)\s+[IVXLCDM]+[:.]\s*[^\n]{3,})(?:\n|$)', 1),
-            (r'(?:^|\n)\s*((?:ARTICLE|Article)\s+\d+[:.]\s*[^\n]{3,})(?:\n|$)', 1),
-            
-            # Section level
-            (r'(?:^|\n)\s*((?:SECTION|Section)\s+\d+(?:\.\d+)?[:.]\s*[^\n]{3,})(?:\n|$)', 2),
-            (r'(?:^|\n)\s*(\d+\.\d+\s+[A-Z][^\n]{3,})(?:\n|$)', 2),
-            
-            # Subsection level
-            (r'(?:^|\n)\s*((?:SECTION|Section)\s+\d+(?:\.\d+)?[\(\[][a-z0-9]+[\)\]][:.]\s*[^\n]{3,})(?:\n|$)', 3),
-            (r'(?:^|\n)\s*(\d+\.\d+[\(\[][a-z0-9]+[\)\]]\s+[A-Z][^\n]{3,})(?:\n|$)', 3),
-            
-            # General numbered/lettered subsections
-            (r'(?:^|\n)\s*([\(\[][a-z0-9]+[\)\]]\s+[A-Z][^\n]{3,})(?:\n|$)', 3),
-            
-            # ALL CAPS headings (common in leases)
-            (r'(?:^|\n)\s*([A-Z][A-Z\s\d.,:;(){}_-]{8,}[A-Z])(?:\n|$)', 2),
-        ]
+        self.heading_patterns = HEADING_PATTERNS
     
     async def process(self) -> List[Dict[str, Any]]:
         """
@@ -170,7 +197,7 @@ class RecursiveGPTChunker:
         # Find all potential headings
         potential_headings = []
         for pattern, level in self.heading_patterns:
-            for match in re.finditer(pattern, self.text_content, re.MULTILINE):
+            for match in pattern.finditer(self.text_content):
                 heading_text = match.group(1).strip()
                 potential_headings.append({
                     'text': heading_text,
@@ -303,7 +330,7 @@ class RecursiveGPTChunker:
         Fallback AST building when no clear headings are found
         """
         # Try to identify paragraph breaks as boundaries
-        paragraphs = re.split(r'\n\s*\n', self.text_content)
+        paragraphs = PARAGRAPH_BREAK.split(self.text_content)
         
         if len(paragraphs) < 3:
             # Very simple document - create one root node
@@ -371,6 +398,11 @@ class RecursiveGPTChunker:
         
         logger.info(f"Processing {len(leaf_nodes)} leaf nodes with GPT")
         
+        # Tokenize every leaf in one native batch rather than once per node
+        token_counts = self._estimate_tokens_batch([node.content for node in leaf_nodes])
+        for node, token_count in zip(leaf_nodes, token_counts):
+            node.token_estimate = token_count
+        
         # Process nodes with controlled concurrency
         # Balance speed with quality - don't overwhelm the system
         semaphore = asyncio.Semaphore(8)  # Process 8 chunks in parallel
@@ -425,18 +457,17 @@ class RecursiveGPTChunker:
         
         try:
             # Check token limit and handle smart truncation
-            content_tokens = self._estimate_tokens(node.content)
-            original_content = node.content
+            content_tokens = self._node_tokens(node)
             
             if content_tokens > 2000:  # Optimal chunk size for detailed analysis
                 logger.warning(f"Node content too long ({content_tokens} tokens), applying smart truncation")
                 node.content, was_truncated = self._smart_truncate_content(node.content, 2000)
                 if was_truncated:
                     truncation_note = "Content was truncated due to token limits"
+                    node.token_estimate = self._estimate_tokens(node.content)
             
             # Track tokens used in telemetry
-            final_tokens = self._estimate_tokens(node.content)
-            self.telemetry["total_tokens_used"] += final_tokens
+            self.telemetry["total_tokens_used"] += self._node_tokens(node)
             
             # DEBUG MODE: Skip GPT calls
             if BYPASS_GPT_FOR_DEBUG:
@@ -568,14 +599,20 @@ Please provide your analysis as a JSON object only."""
             return content, False
         
         # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', content)
+        sentences = SENTENCE_BREAK.split(content)
+        
+        # Count each sentence once and accumulate, instead of re-encoding
+        # the growing prefix for every sentence
+        sentences = [sentence + " " for sentence in sentences]
+        sentence_tokens = self._estimate_tokens_batch(sentences)
         
         truncated_content = ""
-        for sentence in sentences:
-            test_content = truncated_content + sentence + " "
-            if self._estimate_tokens(test_content) > max_tokens:
+        total_tokens = 0
+        for sentence, token_count in zip(sentences, sentence_tokens):
+            total_tokens += token_count
+            if total_tokens > max_tokens:
                 break
-            truncated_content = test_content
+            truncated_content += sentence
         
         # If we couldn't fit even one sentence, do character-based truncation
         if not truncated_content.strip():
@@ -761,7 +798,7 @@ Please provide your analysis as a JSON object only."""
             "level": node.level,
             "source_excerpt": source_excerpt,
             "matched_keywords": list(gpt_data.get("key_values", {}).keys()),
-            "token_estimate": self._estimate_tokens(node.content),
+            "token_estimate": self._node_tokens(node),
             "is_table": False,
             "risk_flags": gpt_data.get("risk_flags", []),
             "key_values": gpt_data.get("key_values", {}),
@@ -800,7 +837,7 @@ Please provide your analysis as a JSON object only."""
             "level": node.level,
             "source_excerpt": source_excerpt,
             "matched_keywords": [],
-            "token_estimate": self._estimate_tokens(node.content),
+            "token_estimate": self._node_tokens(node),
             "is_table": False,
             "risk_flags": [],
             "key_values": {},
@@ -822,7 +859,7 @@ Please provide your analysis as a JSON object only."""
         logger.warning("Using fallback chunking method")
         
         # Simple paragraph-based chunking
-        paragraphs = re.split(r'\n\s*\n', self.text_content)
+        paragraphs = PARAGRAPH_BREAK.split(self.text_content)
         chunks = []
         
         current_pos = 0
@@ -855,7 +892,7 @@ Please provide your analysis as a JSON object only."""
                 "level": 1,
                 "source_excerpt": paragraph[:150] + "..." if len(paragraph) > 150 else paragraph,
                 "matched_keywords": [],
-                "token_estimate": self._estimate_tokens(paragraph),
+                "token_estimate": None,  # Filled in below in one batch
                 "is_table": False,
                 "risk_flags": [],
                 "key_values": {},
@@ -868,6 +905,10 @@ Please provide your analysis as a JSON object only."""
             chunks.append(chunk)
             current_pos = para_end + 2
         
+        token_counts = self._estimate_tokens_batch([chunk["content"] for chunk in chunks])
+        for chunk, token_count in zip(chunks, token_counts):
+            chunk["token_estimate"] = token_count
+        
         return chunks
     
     def _extract_pages(self) -> List[Dict[str, Any]]:
@@ -875,13 +916,8 @@ Please provide your analysis as a JSON object only."""
         pages = []
         
         # Look for page markers
-        patterns = [
-            r"---\s*PAGE\s*(\d+)\s*---",
-            r"(?:^|\n)\s*Page\s+(\d+)\s*(?:$|\n)"
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, self.text_content, re.MULTILINE):
+        for pattern in PAGE_MARKER_PATTERNS:
+            for match in pattern.finditer(self.text_content):
                 page_num = int(match.group(1))
                 pages.append({
                     "page_num": page_num,
@@ -902,6 +938,8 @@ Please provide your analysis as a JSON object only."""
                     })
         
         pages.sort(key=lambda x: x["position"])
+        # Sorted start offsets for bisecting in _get_page_for_position
+        self.page_positions = [page["position"] for page in pages]
         return pages
     
     def _get_page_for_position(self, position: int) -> int:
@@ -909,28 +947,44 @@ Please provide your analysis as a JSON object only."""
         if not self.pages:
             return 1
         
-        for i, page in enumerate(self.pages):
-            if page["position"] <= position:
-                page_num = page["page_num"]
-            else:
-                break
-        else:
-            page_num = self.pages[-1]["page_num"]
-        
-        return page_num
+        # Last page starting at or before the position; text ahead of the
+        # first page marker belongs to the first page
+        index = bisect.bisect_right(self.page_positions, position) - 1
+        return self.pages[max(index, 0)]["page_num"]
     
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count for text"""
         if not text:
             return 0
         
-        try:
-            import tiktoken
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        except (ImportError, Exception):
-            # Fallback approximation
-            return max(1, math.ceil(len(text) / 4))
+        encoding = _token_encoding()
+        if encoding is not None:
+            try:
+                return len(encoding.encode(text))
+            except Exception:
+                pass
+        
+        # Fallback approximation
+        return max(1, math.ceil(len(text) / 4))
+    
+    def _estimate_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Estimate token counts for many texts with one multi-threaded tiktoken call"""
+        encoding = _token_encoding()
+        if encoding is not None and texts:
+            try:
+                encoded = encoding.encode_batch(texts, num_threads=os.cpu_count() or 1)
+                return [len(tokens) for tokens in encoded]
+            except Exception:
+                # e.g. special tokens in one text; count them individually
+                pass
+        
+        return [self._estimate_tokens(text) for text in texts]
+    
+    def _node_tokens(self, node: ClauseNode) -> int:
+        """Token count for a node, reusing the batched estimate when present"""
+        if node.token_estimate is None:
+            node.token_estimate = self._estimate_tokens(node.content)
+        return node.token_estimate
     
     async def _save_debug_info(self, chunks: List[Dict[str, Any]]):
         """Save debug information and audit files"""
@@ -10,12 +10,33 @@ import json
 import os
 import asyncio
 import time
+import weakref
 from dataclasses import dataclass, field
 import openai
 
 from app.schemas import LeaseType
 from app.utils.logger import logger
 
+# AsyncOpenAI clients shared per event loop and API key. Each client owns an
+# httpx connection pool that is bound to the loop it first ran on, so clients
+# are never reused across loops.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, openai.AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+
+def _shared_client(api_key: str) -> openai.AsyncOpenAI:
+    """Return the AsyncOpenAI client for this API key on the running event loop"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop yet, so there is nothing safe to share with
+        return openai.AsyncOpenAI(api_key=api_key)
+    
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(api_key)
+    if client is None:
+        client = clients[api_key] = openai.AsyncOpenAI(api_key=api_key)
+    return client
+
 
 @dataclass
 class AIChunk:
@@ -40,7 +61,7 @@ class AIAdvancedChunker:
         self.text_content = text_content
         self.lease_type = lease_type
         self.api_key = api_key
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = _shared_client(api_key)
         self.chunks: List[AIChunk] = []
         
     async def process(self) -> List[Dict[str, Any]]:
@@ -9,7 +9,7 @@ Every extraction decision is made by GPT-4, not by hardcoded rules.
 import json
 import asyncio
 import os
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 import openai
@@ -29,6 +29,23 @@ class IntelligentChunk:
     extracted_data: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class StageResult:
+    """Output of one phase of the AI-native extraction pipeline"""
+    stage: str  # Key of this output in the complete extraction result
+    data: Any
+
+
+# Pipeline stages in the order they appear in the complete extraction result
+RESULT_STAGES = (
+    "extracted_clauses",
+    "document_structure",
+    "relationships",
+    "risk_analysis",
+    "completeness_report",
+    "metadata",
+)
+
 class AILeaseIntelligence:
     """
     Complete AI-driven lease extraction system.
@@ -47,6 +64,23 @@ class AILeaseIntelligence:
         """
         Main extraction pipeline - fully AI-driven
         """
+        stages = {}
+        async for result in self.stream_extract(pdf_content, lease_type):
+            stages[result.stage] = result.data
+        
+        return {stage: stages[stage] for stage in RESULT_STAGES}
+    
+    async def stream_extract(
+        self,
+        pdf_content: Dict[str, Any],
+        lease_type: LeaseType
+    ) -> AsyncIterator[StageResult]:
+        """
+        Run the extraction pipeline, yielding each phase's output as soon as
+        it is ready so callers can report progress before the pipeline finishes.
+        The pipeline pauses at each yield: the next phase starts only when the
+        caller asks for the next stage.
+        """
         logger.info("Starting AI-native lease extraction")
         
         # Log content size
@@ -57,6 +91,7 @@ class AILeaseIntelligence:
             # Phase 1: AI Document Structure Understanding
             logger.info("Phase 1: Understanding document structure...")
             document_structure = await self._understand_document_structure(pdf_content)
+            yield StageResult("document_structure", document_structure)
             
             # Phase 2: Intelligent Chunking (AI decides boundaries)
             logger.info("Phase 2: Creating intelligent chunks...")
@@ -65,6 +100,7 @@ class AILeaseIntelligence:
                 document_structure
             )
             logger.info(f"Created {len(intelligent_chunks)} intelligent chunks")
+            yield StageResult("intelligent_chunks", intelligent_chunks)
             
             # Phase 3: Multi-Pass AI Extraction
             logger.info("Phase 3: Starting multi-pass extraction...")
@@ -72,10 +108,12 @@ class AILeaseIntelligence:
                 intelligent_chunks,
                 lease_type
             )
+            yield StageResult("extracted_clauses", extraction_results)
             
             # Phase 4: AI Relationship Mapping
             logger.info("Phase 4: Mapping clause relationships...")
             relationships = await self._map_clause_relationships(extraction_results)
+            yield StageResult("relationships", relationships)
             
             # Phase 5: AI Risk Analysis
             logger.info("Phase 5: Performing risk analysis...")
@@ -83,6 +121,7 @@ class AILeaseIntelligence:
                 extraction_results,
                 relationships
             )
+            yield StageResult("risk_analysis", risk_analysis)
             
             # Phase 6: AI Completeness Check
             logger.info("Phase 6: Verifying completeness...")
@@ -90,19 +129,13 @@ class AILeaseIntelligence:
                 extraction_results,
                 lease_type
             )
+            yield StageResult("completeness_report", completeness)
             
-            return {
-                "extracted_clauses": extraction_results,
-                "document_structure": document_structure,
-                "relationships": relationships,
-                "risk_analysis": risk_analysis,
-                "completeness_report": completeness,
-                "metadata": {
-                    "extraction_method": "ai_native",
-                    "confidence_score": self._calculate_overall_confidence(extraction_results),
-                    "extraction_timestamp": datetime.utcnow().isoformat()
-                }
-            }
+            yield StageResult("metadata", {
+                "extraction_method": "ai_native",
+                "confidence_score": self._calculate_overall_confidence(extraction_results),
+                "extraction_timestamp": datetime.utcnow().isoformat()
+            })
         except Exception as e:
             logger.error(f"AI-native extraction failed at some phase: {e}")
             raise
@@ -9,6 +9,31 @@ import re
 from app.utils.logger import logger
 
 
+# Essential lease terms checked on documents that pass validation
+ESSENTIAL_TERM_PATTERNS = [
+    (re.compile(rf'\b{term}\b'), description)
+    for term, description in [
+        ("tenant", "tenant name"),
+        ("landlord", "landlord name"),
+        ("rent", "rent amount"),
+        ("term", "lease term"),
+        ("premises", "premises description")
+    ]
+]
+
+# Patterns indicating a template with unfilled fields
+TEMPLATE_INDICATOR_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r'\[.*?\]',  # Brackets
+        r'\{.*?\}',  # Braces
+        r'___+',     # Underscores
+        r'\binsert\s+here\b',
+        r'\bto\s+be\s+determined\b',
+        r'\btbd\b'
+    ]
+]
+
+
 class DocumentValidator:
     """
     Validates documents and determines their type before processing.
@@ -59,6 +84,15 @@ class DocumentValidator:
         self.min_lease_score = 5.0
         self.max_non_lease_score = 4.0
         
+        # Compile every indicator once so validation does not go through the re cache per pattern
+        self._compiled_lease_indicators = [
+            (re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in self.lease_indicators
+        ]
+        self._compiled_non_lease_indicators = {
+            doc_type: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+            for doc_type, patterns in self.non_lease_indicators.items()
+        }
+        
     def validate_document(self, text: str, filename: Optional[str] = None) -> Tuple[bool, str, float, List[str]]:
         """
         Validate if a document is a lease and determine its type.
@@ -80,17 +114,17 @@ class DocumentValidator:
         lease_score = 0.0
         matched_patterns = []
         
-        for pattern, weight in self.lease_indicators:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, weight in self._compiled_lease_indicators:
+            if pattern.search(text_lower):
                 lease_score += weight
-                matched_patterns.append(pattern)
+                matched_patterns.append(pattern.pattern)
                 
         # Check for non-lease document types
         non_lease_scores = {}
-        for doc_type, patterns in self.non_lease_indicators.items():
+        for doc_type, patterns in self._compiled_non_lease_indicators.items():
             score = 0.0
             for pattern, weight in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
+                if pattern.search(text_lower):
                     score += weight
             non_lease_scores[doc_type] = score
             
@@ -125,34 +159,17 @@ class DocumentValidator:
         # Add specific warnings based on content
         if is_lease:
             # Check for completeness
-            essential_terms = [
-                ("tenant", "tenant name"),
-                ("landlord", "landlord name"),
-                ("rent", "rent amount"),
-                ("term", "lease term"),
-                ("premises", "premises description")
-            ]
-            
             missing_terms = []
-            for term, description in essential_terms:
-                if not re.search(rf'\b{term}\b', text_lower):
+            for pattern, description in ESSENTIAL_TERM_PATTERNS:
+                if not pattern.search(text_lower):
                     missing_terms.append(description)
                     
             if missing_terms:
                 warnings.append(f"Missing essential terms: {', '.join(missing_terms)}")
                 
         # Check for template indicators
-        template_indicators = [
-            r'\[.*?\]',  # Brackets
-            r'\{.*?\}',  # Braces
-            r'___+',     # Underscores
-            r'\binsert\s+here\b',
-            r'\bto\s+be\s+determined\b',
-            r'\btbd\b'
-        ]
-        
-        template_count = sum(1 for pattern in template_indicators 
-                           if re.search(pattern, text_lower))
+        template_count = sum(1 for pattern in TEMPLATE_INDICATOR_PATTERNS 
+                           if pattern.search(text_lower))
         
         if template_count >= 3:
             warnings.append("Document appears to be a template with unfilled fields")
@@ -5,6 +5,8 @@ import asyncio
 import time
 import openai
 import re
+import hashlib
+import tempfile
 from app.schemas import LeaseType, ClauseExtraction
 from app.utils.logger import logger
 from app.core.ast_extractor import build_lease_ast, extract_clauses_with_ast
@@ -41,13 +43,25 @@ RISK_PATTERNS = {
     "ambiguous_late_fee": r"(?i)late\s+fee.*(?!amount|percent|\$|\d)"
 }
 
+# Placeholder patterns that mark an unfilled template, compiled once at import
+TEMPLATE_PLACEHOLDER_PATTERNS = [re.compile(p) for p in (r'\[.+?\]', r'\{\{.+?\}\}', r'\$\[#\]')]
+
+EXTRACTION_MODEL = "gpt-4-turbo-preview"
+
+# Opt-in exact-match cache of GPT responses, for test runs that resend the same prompts
+LLM_RESPONSE_CACHE = os.environ.get("LLM_RESPONSE_CACHE", "false").lower() == "true"
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "acre_llm_cache"))
+
 def is_template_lease(text):
     """Check if the lease appears to be a template with placeholders"""
-    placeholder_patterns = [r'\[.+?\]', r'\{\{.+?\}\}', r'\$\[#\]']
     placeholder_count = 0
-    for pattern in placeholder_patterns:
-        placeholder_count += len(re.findall(pattern, text))
-    return placeholder_count > 5
+    for pattern in TEMPLATE_PLACEHOLDER_PATTERNS:
+        # Stop scanning as soon as the threshold is crossed
+        for _ in pattern.finditer(text):
+            placeholder_count += 1
+            if placeholder_count > 5:
+                return True
+    return False
 
 def detect_risk_tags(text: str, extracted_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Detect risk tags based on text patterns and extracted data"""
@@ -595,8 +609,44 @@ async def process_segment_enhanced(segment: Dict[str, Any], lease_type: LeaseTyp
             logger.error(f"Error processing segment {segment.get('section_name')}: {str(e)}")
             return {}
 
+def _llm_cache_path(system_prompt: str, user_prompt: str) -> str:
+    """Cache file for a prompt pair, keyed by a SHA-256 of the prompts and model"""
+    key = hashlib.sha256("\x1f".join((system_prompt, user_prompt, EXTRACTION_MODEL)).encode()).hexdigest()
+    return os.path.join(LLM_CACHE_DIR, f"{key}.txt")
+
+
+def _read_llm_cache(cache_path: str) -> Optional[str]:
+    """Read a cached response, or None if there is none"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_llm_cache(cache_path: str, response_content: str):
+    """Write a response to a temp file and swap it in, so readers never see a partial entry"""
+    os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=LLM_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(response_content)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 async def call_openai_api(system_prompt: str, user_prompt: str) -> str:
     """Call OpenAI API with enhanced retry logic and diagnostics"""
+    if LLM_RESPONSE_CACHE:
+        cache_path = _llm_cache_path(system_prompt, user_prompt)
+        cached_response = await asyncio.to_thread(_read_llm_cache, cache_path)
+        if cached_response is not None:
+            logger.info("Using cached GPT response")
+            return cached_response
+    
     max_retries = 3
     retry_delay = 1
     
@@ -623,7 +673,7 @@ async def call_openai_api(system_prompt: str, user_prompt: str) -> str:
                         modified_user_prompt = user_prompt + "\n\nReturn your response as valid JSON format."
                     
                     response = sync_client.chat.completions.create(
-                        model="gpt-4-turbo-preview",  # Use full GPT-4 Turbo, not mini
+                        model=EXTRACTION_MODEL,  # Use full GPT-4 Turbo, not mini
                         messages=[
                             {"role": "system", "content": system_prompt},
                             {"role": "user", "content": modified_user_prompt}
@@ -646,6 +696,13 @@ async def call_openai_api(system_prompt: str, user_prompt: str) -> str:
             response_time = time.time() - start_time
             logger.info(f"GPT API call successful in {response_time:.2f} seconds")
             
+            if LLM_RESPONSE_CACHE and response_content:
+                try:
+                    await asyncio.to_thread(_write_llm_cache, cache_path, response_content)
+                except OSError as e:
+                    # A failed cache write must not turn a successful call into a retry
+                    logger.warning(f"Could not cache GPT response: {e}")
+            
             return response_content
             
         except asyncio.TimeoutError:
@@ -1,5 +1,6 @@
 import os
 import re
+import asyncio
 import pytesseract
 from pdf2image import convert_from_path
 import fitz  # PyMuPDF
@@ -12,11 +13,25 @@ MIN_CHARS_REQUIRED = 200
 MIN_NON_WHITESPACE_REQUIRED = 100
 MIN_LINES_REQUIRED = 5
 
+# Maximum number of documents going through text extraction/OCR at once
+OCR_CONCURRENCY = int(os.environ.get("OCR_CONCURRENCY", "2"))
+_ocr_slots = asyncio.Semaphore(OCR_CONCURRENCY)
+
 async def perform_ocr(file_path: str) -> Tuple[bool, str]:
     """
     Check if the PDF needs OCR and perform it if necessary.
     Returns a tuple (is_scanned, text_content).
+    
+    Extraction and OCR are CPU-bound, so they run in a worker thread. This keeps
+    the event loop free for other requests' GPT calls while this document is
+    being read, with at most OCR_CONCURRENCY documents in this stage at a time.
     """
+    async with _ocr_slots:
+        return await asyncio.to_thread(_perform_ocr_sync, file_path)
+
+
+def _perform_ocr_sync(file_path: str) -> Tuple[bool, str]:
+    """Synchronous body of perform_ocr"""
     try:
         # First try to extract text directly from PDF
         text_content = extract_text_from_pdf(file_path)
@@ -91,35 +106,35 @@ async def perform_ocr(file_path: str) -> Tuple[bool, str]:
 
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text directly from a native PDF file with enhanced error reporting"""
-    text = ""
+    page_texts = []
     page_stats = []
     
     try:
-        # Open the PDF
-        doc = fitz.open(file_path)
-        
-        logger.info(f"PDF has {len(doc)} pages")
-        
-        # Try to extract document metadata
-        metadata = doc.metadata
-        if metadata:
-            logger.info(f"PDF metadata: Title='{metadata.get('title', 'None')}', Author='{metadata.get('author', 'None')}', Creator='{metadata.get('creator', 'None')}', Producer='{metadata.get('producer', 'None')}', Encryption={doc.is_encrypted}")
-        
-        # Extract text from each page
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            page_text = page.get_text()
-            text += page_text
+        # Open the PDF; MuPDF reads the file natively, and the context manager
+        # releases the underlying file handle as soon as extraction is done
+        with fitz.open(file_path) as doc:
+            logger.info(f"PDF has {len(doc)} pages")
+            
+            # Try to extract document metadata
+            metadata = doc.metadata
+            if metadata:
+                logger.info(f"PDF metadata: Title='{metadata.get('title', 'None')}', Author='{metadata.get('author', 'None')}', Creator='{metadata.get('creator', 'None')}', Producer='{metadata.get('producer', 'None')}', Encryption={doc.is_encrypted}")
             
-            # Collect statistics for this page
-            non_ws_count = len(re.sub(r'\s', '', page_text))
-            lines_count = len(page_text.splitlines())
-            page_stats.append({
-                "page": page_num + 1,
-                "chars": len(page_text),
-                "non_whitespace": non_ws_count,
-                "lines": lines_count
-            })
+            # Extract text from each page
+            for page_num in range(len(doc)):
+                page = doc.load_page(page_num)
+                page_text = page.get_text()
+                page_texts.append(page_text)
+                
+                # Collect statistics for this page
+                non_ws_count = len(re.sub(r'\s', '', page_text))
+                lines_count = len(page_text.splitlines())
+                page_stats.append({
+                    "page": page_num + 1,
+                    "chars": len(page_text),
+                    "non_whitespace": non_ws_count,
+                    "lines": lines_count
+                })
             
         # Log page statistics for debugging
         empty_pages = [p["page"] for p in page_stats if p["non_whitespace"] < 20]
@@ -130,7 +145,7 @@ def extract_text_from_pdf(file_path: str) -> str:
         if page_stats and all(p["non_whitespace"] < 20 for p in page_stats[:min(3, len(page_stats))]):
             logger.warning("First few pages appear to have little textual content")
             
-        return text
+        return "".join(page_texts)
         
     except fitz.EmptyFileError:
         logger.error(f"Empty or invalid PDF file: {file_path}")
@@ -1,5 +1,5 @@
 from typing import Dict, List, Any, Tuple, Optional, Set
-from app.schemas import LeaseType, ClauseExtraction, RiskLevel, RiskFlag
+from app.schemas import LeaseType, ClauseExtraction, RiskLevel, RiskFlag, trusted
 from app.utils.logger import logger
 # Removed missing imports - using simplified essential clauses check
 import re
@@ -278,7 +278,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         # Check for broad assignment rights
         broad_assignment_pattern = (r"(freely|without\s+(landlord'?s\s+)?consent|may\s+assign\s+without).*?(assign|transfer|sublet)")
         if re.search(broad_assignment_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.HIGH,
@@ -293,7 +293,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         restriction_pattern = r"(no|not|prohibit|restrict).*?\s+assign|sublet"
         consent_standard_pattern = r"consent.*?\s+not.*?\s+(unreasonably|arbitrarily).*?\s+(withheld|delayed|conditioned)"
         if re.search(restriction_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(consent_standard_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.MEDIUM,
@@ -310,7 +310,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         termination_pattern = r"(early|right\s+to).*\s+terminat"
         notice_pattern = r"notice.*?\s+(\d+|thirty|sixty|ninety).*?\s+(day|month|week)"
         if re.search(termination_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(notice_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.HIGH,
@@ -324,7 +324,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         # Check for uncertain commencement date
         uncertain_commencement_pattern = r"commencement.*?\s+(to\s+be|shall\s+be|will\s+be)\s+determin|commencement.*?\s+not\s+(yet)?\s+determin"
         if re.search(uncertain_commencement_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.MEDIUM,
@@ -341,7 +341,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         escalation_pattern = r"(increas|escalat|adjust)"
         amount_pattern = r"(\d+(\.\d+)?%|\d+\s+percent|\$\s*\d+)"
         if re.search(escalation_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(amount_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.HIGH,
@@ -356,7 +356,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         cpi_pattern = r"(CPI|consumer\s+price\s+index)"
         cap_pattern = r"(cap|maximum|not\s+to\s+exceed|ceiling)"
         if re.search(cpi_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(cap_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.MEDIUM,
@@ -372,7 +372,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         # Check for missing insurance requirements
         coverage_pattern = r"(coverage|policy|limit|amount)"
         if len(text) < 200 or not re.search(coverage_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.HIGH,
@@ -387,7 +387,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         subrogation_pattern = r"subrogation"
         mutual_waiver_pattern = r"(mutual|both\s+parties).*?\s+waiver.*?\s+subrogation"
         if re.search(subrogation_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(mutual_waiver_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.MEDIUM,
@@ -404,7 +404,7 @@ def analyze_clause_risks(key: str, clause: ClauseExtraction, lease_type: LeaseTy
         restrictive_use_pattern = r"(only|solely|exclusively)\s+for"
         flexibility_pattern = r"(similar|other|additional|related)\s+(use|purpose)"
         if re.search(restrictive_use_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(flexibility_pattern, text, re.IGNORECASE | re.DOTALL):
-            risks.append(RiskFlag(
+            risks.append(trusted(RiskFlag,
                 clause_key=key,
                 clause_name=key.replace("_", " ").title(),
                 level=RiskLevel.MEDIUM,
@@ -444,7 +444,7 @@ def analyze_retail_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
             has_cotenancy = True
             remedy_pattern = r"(terminat|reduc|abate|remedy)"
             if not re.search(remedy_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.HIGH,
@@ -460,7 +460,7 @@ def analyze_retail_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         percentage_pattern = r"(\d+(\.\d+)?%|\d+\s+percent)"
         if "percentage_rent" in key.lower() or re.search(percentage_rent_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(percentage_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -477,7 +477,7 @@ def analyze_retail_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         mandate_pattern = r"(must|shall|required|obligated)"
         if "operating_hours" in key.lower() or "hours_of_operation" in key.lower() or re.search(hours_pattern, text, re.IGNORECASE | re.DOTALL):
             if re.search(mall_hours_pattern, text, re.IGNORECASE | re.DOTALL) and re.search(mandate_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -494,7 +494,7 @@ def analyze_retail_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         retail_pattern = r"(retail|shopping center|mall)"
         if "exclusive" in key.lower() or re.search(exclusive_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(tenant_exclusive_pattern, text, re.IGNORECASE | re.DOTALL) and re.search(retail_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -516,7 +516,7 @@ def analyze_retail_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
             use_text += clause.content.lower() + " " + clause.raw_excerpt.lower()
     
     if not has_cotenancy and re.search(r"(retail|store|shop|shopping center|mall)", use_text, re.IGNORECASE | re.DOTALL):
-        risks.append(RiskFlag(
+        risks.append(trusted(RiskFlag,
             clause_key="missing_cotenancy",
             clause_name="Missing Co-Tenancy",
             level=RiskLevel.HIGH,
@@ -555,7 +555,7 @@ def analyze_office_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         cap_pattern = r"(cap|ceiling|maximum|not\s+to\s+exceed)"
         if any(term in key.lower() for term in ["operating_expenses", "opex", "expense"]) or re.search(opex_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(cap_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -568,7 +568,7 @@ def analyze_office_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
             
             audit_pattern = r"(audit|review|inspect|examin).*?\s+(books|records)"
             if not re.search(audit_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -584,7 +584,7 @@ def analyze_office_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         measurement_std_pattern = r"(BOMA|REBNY|measurement\s+standard)"
         if any(term in key.lower() for term in ["square_feet", "sqft", "area", "premises"]) or re.search(sqft_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(measurement_std_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -600,7 +600,7 @@ def analyze_office_specific_risks(clauses: Dict[str, ClauseExtraction]) -> Tuple
         amount_pattern = r"(\$\s*\d+|\d+\s+dollars|per\s+square\s+foot)"
         if any(term in key.lower() for term in ["improvement", "allowance", "buildout"]) or re.search(ti_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(amount_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -644,7 +644,7 @@ def analyze_industrial_specific_risks(clauses: Dict[str, ClauseExtraction]) -> T
         preexisting_pattern = r"(pre.*?exist|prior|existing)"
         if "environmental" in key.lower() or re.search(env_pattern, text, re.IGNORECASE | re.DOTALL):
             if re.search(tenant_resp_pattern, text, re.IGNORECASE | re.DOTALL) and re.search(preexisting_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.HIGH,
@@ -660,7 +660,7 @@ def analyze_industrial_specific_risks(clauses: Dict[str, ClauseExtraction]) -> T
         landlord_rep_pattern = r"(landlord|lessor).*?\s+(represent|warrant|disclos)"
         if "hazardous" in key.lower() or "hazmat" in key.lower() or re.search(hazmat_pattern, text, re.IGNORECASE | re.DOTALL):
             if not re.search(landlord_rep_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.HIGH,
@@ -674,7 +674,7 @@ def analyze_industrial_specific_risks(clauses: Dict[str, ClauseExtraction]) -> T
             indemnify_pattern = r"(indemnif|hold\s+harmless).*?\s+(landlord|lessor)"
             except_pattern = r"except.*?\s+(pre.*?exist|prior|existing)"
             if re.search(indemnify_pattern, text, re.IGNORECASE | re.DOTALL) and not re.search(except_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.HIGH,
@@ -691,7 +691,7 @@ def analyze_industrial_specific_risks(clauses: Dict[str, ClauseExtraction]) -> T
         existing_pattern = r"(existing|current|premises)"
         if re.search(ada_pattern, text, re.IGNORECASE | re.DOTALL):
             if re.search(tenant_ada_pattern, text, re.IGNORECASE | re.DOTALL) and re.search(existing_pattern, text, re.IGNORECASE | re.DOTALL):
-                risks.append(RiskFlag(
+                risks.append(trusted(RiskFlag,
                     clause_key=key,
                     clause_name=key.replace("_", " ").title(),
                     level=RiskLevel.MEDIUM,
@@ -765,7 +765,7 @@ def analyze_cross_clause_risks(clauses: Dict[str, ClauseExtraction], lease_type:
                 break
     
     if repair_responsibility == "tenant" and insurance_coverage == "landlord":
-        risks.append(RiskFlag(
+        risks.append(trusted(RiskFlag,
             clause_key="cross_clause_risk",
             clause_name="Repair/Insurance Mismatch",
             level=RiskLevel.HIGH,
@@ -809,7 +809,7 @@ def analyze_cross_clause_risks(clauses: Dict[str, ClauseExtraction], lease_type:
                 break
     
     if tenant_termination and landlord_remedies_accelerated:
-        risks.append(RiskFlag(
+        risks.append(trusted(RiskFlag,
             clause_key="cross_clause_risk",
             clause_name="Termination vs. Acceleration",
             level=RiskLevel.MEDIUM,
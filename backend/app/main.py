@@ -4,6 +4,7 @@ from fastapi.staticfiles import StaticFiles
 import os
 from dotenv import load_dotenv
 from app.routes import process, export, feedback
+from app.training.feedback_manager import feedback_writer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -35,6 +36,14 @@ app.include_router(process.router, prefix="/api", tags=["Process"])
 app.include_router(export.router, prefix="/api", tags=["Export"])
 app.include_router(feedback.router, prefix="/api", tags=["Feedback"])
 
+@app.on_event("startup")
+async def start_feedback_writer():
+    feedback_writer.start()
+
+@app.on_event("shutdown")
+async def flush_feedback_writer():
+    await feedback_writer.stop()
+
 # Mount storage directories for static file access
 os.makedirs("app/storage/exports", exist_ok=True)
 app.mount("/exports", StaticFiles(directory="app/storage/exports"), name="exports")
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from app.schemas import FeedbackRequest, FeedbackResponse
+from app.schemas import FeedbackRequest, FeedbackResponse, trusted
 from app.training.feedback_manager import store_feedback, get_lease_feedback, get_feedback_by_field_id, get_feedback_statistics
 from app.utils.logger import logger
+import asyncio
 import uuid
 
 router = APIRouter()
@@ -14,7 +15,7 @@ async def submit_feedback(feedback: FeedbackRequest):
     """
     try:
         # Generate a unique ID for this feedback
-        feedback_id = str(uuid.uuid4())
+        feedback_id = uuid.uuid4().hex
         
         # Store the feedback with enhanced field identification
         await store_feedback(
@@ -30,7 +31,8 @@ async def submit_feedback(feedback: FeedbackRequest):
         
         logger.info(f"Feedback submitted for lease {feedback.lease_id}, field {feedback.field_id}")
         
-        return FeedbackResponse(
+        return trusted(
+            FeedbackResponse,
             success=True,
             feedback_id=feedback_id
         )
@@ -87,6 +89,30 @@ async def get_field_feedback(
         raise HTTPException(status_code=500, detail=f"Error retrieving field feedback: {str(e)}")
 
 
+@router.get("/feedback/{lease_id}/full")
+async def get_lease_feedback_full(lease_id: str):
+    """
+    Get all feedback for a lease together with the overall feedback statistics.
+    Both lookups are independent, so they are issued concurrently.
+    """
+    try:
+        feedback, stats = await asyncio.gather(
+            get_lease_feedback(lease_id),
+            get_feedback_statistics()
+        )
+        
+        return {
+            "lease_id": lease_id,
+            "feedback_count": len(feedback),
+            "feedback": feedback,
+            "statistics": stats
+        }
+        
+    except Exception as e:
+        logger.error(f"Error retrieving full feedback for lease {lease_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving feedback: {str(e)}")
+
+
 @router.get("/feedback/statistics")
 async def get_feedback_stats():
     """
@@ -1,22 +1,100 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, FileResponse
 from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from collections import OrderedDict
 import os
+import io
+import re
+import csv
 import time
+import asyncio
+import heapq
+import hashlib
 import uuid
 import json
+import orjson
 import aiofiles
-from app.schemas import LeaseType, SummaryStyle, ProcessResponse, ClauseExtraction
+import aiofiles.os
+from app.schemas import LeaseType, SummaryStyle, ProcessResponse, ClauseExtraction, RiskFlag, trusted, type_adapter
 from app.core.ocr import perform_ocr
 from app.core.segmenter import segment_lease
 from app.core.enhanced_gpt_extract import EnhancedLeaseExtractor, extract_clauses
+from app.core.gpt_extract import is_template_lease
 from app.core.summary_generator_v2 import generate_markdown_summary, generate_csv_rows
 from app.core.risk_analyzer import analyze_risks
 from app.core.consistency_checker import ConsistencyChecker
 from app.core.document_validator import DocumentValidator
-from app.utils.logger import logger
+from app.utils.logger import logger, lease_id_var
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Whether to store intermediate artifacts (text.txt, segments.json, validation_failed.json).
+# clauses.json, export.csv and response.json are always written since the GET endpoints read them.
+# text.txt and segments.json are also inputs to the TrainingManager, so this defaults to on.
+PERSIST_DEBUG_ARTIFACTS = os.environ.get("PERSIST_DEBUG_ARTIFACTS", "true").lower() == "true"
+
+# The validator only holds constant pattern tables, so one instance serves all requests
+document_validator = DocumentValidator()
+
+# Characters that mark an unfilled template placeholder in extracted values
+PLACEHOLDER_PATTERN = re.compile(r'[\[{]')
+
+# Number of longest segments sampled when checking for template leases
+TEMPLATE_SAMPLE_SEGMENTS = 5
+
+# Template verdicts for recently seen segment contents, keyed by content digest
+TEMPLATE_CACHE_SIZE = 4096
+_template_verdicts = OrderedDict()
+
+# Size of each read when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Salted into the content-addressed lease ID. Bump it whenever extraction, risk
+# analysis or summary generation changes, so stored responses are recomputed.
+PIPELINE_VERSION = "1"
+
+# Futures for uploads currently being processed, keyed by lease ID, so identical
+# concurrent uploads wait for the first run instead of processing again
+_in_flight: Dict[str, asyncio.Future] = {}
+
+# Number of rows serialized per write when saving CSV exports
+CSV_BATCH_ROWS = 1000
+
+
+@lru_cache(maxsize=1024)
+def _clause_hint(key: str) -> str:
+    """Derive the clause hint from a clause key (lowercased, "_data" suffix removed)"""
+    clause_hint = key.lower()
+    if clause_hint.endswith("_data"):
+        clause_hint = clause_hint[:-5]
+    return clause_hint
+
+
+def _find_placeholder_description(structured_data: Dict[str, Any]) -> Optional[str]:
+    """Describe the first structured value that still contains a placeholder"""
+    for k, v in structured_data.items():
+        if isinstance(v, str) and PLACEHOLDER_PATTERN.search(v):
+            return f"Placeholder value in {k}: {v}"
+    return None
+
+
+def _is_template_segment(content: str) -> bool:
+    """
+    Memoized is_template_lease keyed by a digest of the segment content, so
+    boilerplate repeated across leases and retried uploads is only scanned once.
+    """
+    content_hash = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    is_template = _template_verdicts.get(content_hash)
+    if is_template is None:
+        is_template = is_template_lease(content)
+        _template_verdicts[content_hash] = is_template
+        if len(_template_verdicts) > TEMPLATE_CACHE_SIZE:
+            _template_verdicts.popitem(last=False)
+    else:
+        _template_verdicts.move_to_end(content_hash)
+    return is_template
 
 
 def convert_clauses_to_chunks(clauses: Dict[str, ClauseExtraction], lease_type: LeaseType = None) -> List[Dict[str, Any]]:
@@ -30,13 +108,12 @@ def convert_clauses_to_chunks(clauses: Dict[str, ClauseExtraction], lease_type:
         List of chunk dictionaries compatible with summary_generator_v2
     """
     chunks = []
-    risk_deduplication = {}  # Track risks by clause type for deduplication
+    lease_type_value = None
+    if lease_type:
+        lease_type_value = lease_type.value if hasattr(lease_type, 'value') else str(lease_type)
     
     for key, clause in clauses.items():
-        # Extract clause hint from the key (remove common suffixes)
-        clause_hint = key.lower()
-        if clause_hint.endswith("_data"):
-            clause_hint = clause_hint[:-5]  # Remove "_data" suffix
+        clause_hint = _clause_hint(key)
         
         # Determine the actual clause type from structured data if available
         clause_type = clause_hint
@@ -46,25 +123,24 @@ def convert_clauses_to_chunks(clauses: Dict[str, ClauseExtraction], lease_type:
         
         # Convert and deduplicate risk_tags to risk_flags format
         risk_flags = []
-        seen_risk_types = set()
         
         if clause.risk_tags:
+            # Keep the first risk of each type for this clause
+            unique_risks = {}
             for risk in clause.risk_tags:
-                risk_type = risk.get("type", "unknown")
-                
-                # Skip if we've already seen this risk type for this clause
-                if risk_type in seen_risk_types:
-                    continue
-                seen_risk_types.add(risk_type)
-                
+                unique_risks.setdefault(risk.get("type", "unknown"), risk)
+            
+            # Placeholder details are the same for every placeholder risk, so find them once
+            placeholder_description = None
+            
+            for risk_type, risk in unique_risks.items():
                 # Create consolidated risk description
                 description = risk.get("description", "Risk identified")
                 if "placeholder" in risk_type and clause.structured_data:
-                    # Add specific placeholder info if available
-                    for k, v in clause.structured_data.items():
-                        if isinstance(v, str) and ("[" in v or "{" in v):
-                            description = f"Placeholder value in {k}: {v}"
-                            break
+                    if placeholder_description is None:
+                        placeholder_description = _find_placeholder_description(clause.structured_data) or ""
+                    if placeholder_description:
+                        description = placeholder_description
                 
                 risk_flag = {
                     "risk_level": risk.get("level", "medium"),
@@ -86,18 +162,18 @@ def convert_clauses_to_chunks(clauses: Dict[str, ClauseExtraction], lease_type:
             "clause_hint": clause_hint,
             "key_values": key_values,
             "risk_flags": risk_flags,
-            "confidence": getattr(clause, 'confidence', 0.8),
+            "confidence": clause.confidence,
             "page_start": clause.page_number,
             "page_end": clause.page_number,  # Single page for most clauses
-            "truncated": getattr(clause, 'needs_review', False)
+            "truncated": clause.needs_review
         }
         
         # Add lease type if provided
-        if lease_type:
-            chunk["lease_type"] = lease_type.value if hasattr(lease_type, 'value') else str(lease_type)
+        if lease_type_value:
+            chunk["lease_type"] = lease_type_value
         
         # Handle page range if available
-        if hasattr(clause, 'page_range') and clause.page_range:
+        if clause.page_range:
             try:
                 if '–' in clause.page_range or '-' in clause.page_range:
                     separator = '–' if '–' in clause.page_range else '-'
@@ -111,6 +187,76 @@ def convert_clauses_to_chunks(clauses: Dict[str, ClauseExtraction], lease_type:
     
     return chunks
 
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to indented JSON bytes for on-disk artifacts"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+
+async def _write_csv_rows(csv_file, rows: List[List[Any]]):
+    """Write CSV rows to an open aiofiles handle in fixed-size batches"""
+    csv_buffer = io.StringIO()
+    csv_writer = csv.writer(csv_buffer)
+    
+    for start in range(0, len(rows), CSV_BATCH_ROWS):
+        csv_writer.writerows(rows[start:start + CSV_BATCH_ROWS])
+        await csv_file.write(csv_buffer.getvalue())
+        
+        # Reuse the buffer so memory stays bounded by one batch
+        csv_buffer.seek(0)
+        csv_buffer.truncate(0)
+
+
+async def _save_upload(upload: UploadFile, file_path: str, digest=None):
+    """
+    Stream an uploaded file to disk in fixed-size chunks to keep memory bounded.
+    If a hashlib digest is given, it is updated with the content as it is written.
+    """
+    async with aiofiles.open(file_path, 'wb') as out_file:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            if digest is not None:
+                digest.update(chunk)
+            await out_file.write(chunk)
+
+
+@asynccontextmanager
+async def _atomic_open(file_path: str, mode: str = 'wb', **kwargs):
+    """
+    Open a unique temp file next to file_path for writing. It replaces file_path
+    only once the block completes, so readers never see a partially written artifact.
+    """
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        async with aiofiles.open(temp_path, mode, **kwargs) as temp_file:
+            yield temp_file
+        await aiofiles.os.replace(temp_path, file_path)
+    except BaseException:
+        if await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
+        raise
+
+
+async def _read_stored_response(processed_dir: str) -> Optional[Dict[str, Any]]:
+    """Load a previously stored response with its raw clauses, or None if there is none"""
+    response_file_path = os.path.join(processed_dir, "response.json")
+    if not await aiofiles.os.path.exists(response_file_path):
+        return None
+        
+    async with aiofiles.open(response_file_path, 'rb') as response_file:
+        response_data = orjson.loads(await response_file.read())
+        
+    # Read the clauses file for raw_clauses
+    clauses_file_path = os.path.join(processed_dir, "clauses.json")
+    raw_clauses = {}
+    
+    if await aiofiles.os.path.exists(clauses_file_path):
+        async with aiofiles.open(clauses_file_path, 'rb') as clauses_file:
+            raw_clauses = orjson.loads(await clauses_file.read())
+            
+    response_data["raw_clauses"] = raw_clauses
+    return response_data
+
+
 @router.post("/process", response_model=ProcessResponse)
 async def process_lease(
     background_tasks: BackgroundTasks,
@@ -134,52 +280,83 @@ async def process_lease(
     All of this happens in a single API call with full audit trail.
     """
     start_time = time.time()
+    lease_context = None
+    lease_id = None
+    in_flight = None
     
     try:
-        # Generate a unique ID for this lease
-        lease_id = str(uuid.uuid4())
-        
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join("app", "storage", "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Create processed directory for this lease
-        processed_dir = os.path.join("app", "storage", "processed", lease_id)
-        os.makedirs(processed_dir, exist_ok=True)
-        
-        # Save the uploaded file
+        # Validate the uploaded file type
         file_extension = os.path.splitext(lease_file.filename)[1].lower()
         if file_extension not in ['.pdf', '.PDF']:
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
             
+        # Create upload directory if it doesn't exist
+        upload_dir = os.path.join("app", "storage", "uploads")
+        await aiofiles.os.makedirs(upload_dir, exist_ok=True)
+        
+        # Stream the upload to a temporary file while hashing it. The lease ID is the
+        # content hash (including the company and the options that affect the result),
+        # so re-uploads of the same document by the same company map to the same
+        # processed directory, and other companies never share its results or feedback.
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("\x1f".join((PIPELINE_VERSION, company_id or "", lease_type.value, str(use_enhanced_extraction), "")).encode())
+        temp_file_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.partial")
+        try:
+            await _save_upload(lease_file, temp_file_path, digest)
+        except BaseException:
+            # Don't leave a half-written upload behind
+            if await aiofiles.os.path.exists(temp_file_path):
+                await aiofiles.os.remove(temp_file_path)
+            raise
+        
+        # Bind the lease ID to all log records for this request
+        lease_id = digest.hexdigest()
+        lease_context = lease_id_var.set(lease_id)
+        
         file_path = os.path.join(upload_dir, f"{lease_id}{file_extension}")
+        await aiofiles.os.replace(temp_file_path, file_path)
+        logger.info("Saved uploaded file to %s", file_path)
         
-        # Save the uploaded file
-        logger.info(f"Saving uploaded file to {file_path}")
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            content = await lease_file.read()
-            await out_file.write(content)
+        # Identical uploads were already processed; return the stored result. If one
+        # is still being processed, wait for it rather than processing it again.
+        processed_dir = os.path.join("app", "storage", "processed", lease_id)
+        while True:
+            stored_response = await _read_stored_response(processed_dir)
+            if stored_response is not None:
+                logger.info("Returning stored result for previously processed upload")
+                return ORJSONResponse(content=stored_response)
+            pending = _in_flight.get(lease_id)
+            if pending is None:
+                break
+            logger.info("Waiting for in-flight processing of an identical upload")
+            await asyncio.wait([pending])
+            
+        # No await between the check above and registering, so only one request owns the run
+        in_flight = asyncio.get_running_loop().create_future()
+        _in_flight[lease_id] = in_flight
+            
+        await aiofiles.os.makedirs(processed_dir, exist_ok=True)
             
         # Check if OCR is needed and perform it
-        logger.info(f"Performing OCR analysis for lease {lease_id}")
+        logger.info("Performing OCR analysis")
         is_scanned, text_content = await perform_ocr(file_path)
-        logger.info(f"OCR completed for lease {lease_id}. Is scanned: {is_scanned}")
+        logger.info("OCR completed. Is scanned: %s", is_scanned)
         
         # Save the extracted text
-        text_file_path = os.path.join(processed_dir, "text.txt")
-        async with aiofiles.open(text_file_path, 'w', encoding='utf-8') as text_file:
-            await text_file.write(text_content)
+        if PERSIST_DEBUG_ARTIFACTS:
+            text_file_path = os.path.join(processed_dir, "text.txt")
+            async with _atomic_open(text_file_path, 'w', encoding='utf-8') as text_file:
+                await text_file.write(text_content)
         
         # Validate document before processing
-        validator = DocumentValidator()
-        is_lease, doc_type, confidence, warnings = validator.validate_document(text_content, lease_file.filename)
+        is_lease, doc_type, confidence, warnings = document_validator.validate_document(text_content, lease_file.filename)
         
         if not is_lease:
-            logger.warning(f"Document {lease_id} does not appear to be a lease. Type: {doc_type}, Confidence: {confidence:.2f}")
+            logger.warning("Document does not appear to be a lease. Type: %s, Confidence: %.2f", doc_type, confidence)
             
             # Return error with helpful information
-            processing_suggestion = validator.suggest_processing_method(doc_type)
-            basic_info = validator.extract_basic_info(text_content)
+            processing_suggestion = document_validator.suggest_processing_method(doc_type)
+            basic_info = document_validator.extract_basic_info(text_content)
             
             error_detail = {
                 "error": "Document does not appear to be a lease agreement",
@@ -196,29 +373,31 @@ async def process_lease(
             }
             
             # Save validation result for debugging
-            validation_file_path = os.path.join(processed_dir, "validation_failed.json")
-            async with aiofiles.open(validation_file_path, 'w', encoding='utf-8') as val_file:
-                await val_file.write(json.dumps(error_detail, indent=2))
+            if PERSIST_DEBUG_ARTIFACTS:
+                validation_file_path = os.path.join(processed_dir, "validation_failed.json")
+                async with _atomic_open(validation_file_path) as val_file:
+                    await val_file.write(_dumps(error_detail))
                 
             raise HTTPException(status_code=400, detail=error_detail)
         
         # Log validation warnings if any
         if warnings:
-            logger.info(f"Document validation warnings for {lease_id}: {warnings}")
+            logger.info("Document validation warnings: %s", warnings)
         
-        # Segment the lease into sections
-        logger.info(f"Segmenting lease {lease_id}")
-        segments = segment_lease(text_content, lease_type)
-        logger.info(f"Lease segmentation completed for {lease_id}. Found {len(segments)} segments")
+        # Segment the lease into sections; this and the other CPU-bound stages below run
+        # in worker threads so concurrent requests are not stalled behind them
+        logger.info("Segmenting lease")
+        segments = await asyncio.to_thread(segment_lease, text_content, lease_type)
+        logger.info("Lease segmentation completed. Found %d segments", len(segments))
         
         # Save the segments
-        segments_file_path = os.path.join(processed_dir, "segments.json")
-        async with aiofiles.open(segments_file_path, 'w', encoding='utf-8') as segments_file:
-            import json
-            await segments_file.write(json.dumps(segments, indent=2))
+        if PERSIST_DEBUG_ARTIFACTS:
+            segments_file_path = os.path.join(processed_dir, "segments.json")
+            async with _atomic_open(segments_file_path) as segments_file:
+                await segments_file.write(_dumps(segments))
         
         # Extract clauses using enhanced system if enabled
-        logger.info(f"Extracting clauses using {'enhanced' if use_enhanced_extraction else 'standard'} system for lease {lease_id}")
+        logger.info("Extracting clauses using %s system", 'enhanced' if use_enhanced_extraction else 'standard')
         
         extraction_result = None
         validation_report = None
@@ -240,14 +419,15 @@ async def process_lease(
             insights = extraction_result.get("insights", {})
             
             # Log additional results
-            logger.info(f"Enhanced extraction complete: {len(clauses)} clauses, "
-                       f"{len(extraction_result.get('tables', []))} tables, "
-                       f"{validation_report.overall_score if validation_report else 0:.1f}% validation score")
+            logger.info("Enhanced extraction complete: %d clauses, %d tables, %.1f%% validation score",
+                        len(clauses),
+                        len(extraction_result.get('tables', [])),
+                        validation_report.overall_score if validation_report else 0)
         else:
             # Use standard extraction for backward compatibility
             clauses = await extract_clauses(segments, lease_type)
             
-        logger.info(f"Clause extraction completed for lease {lease_id}. Found {len(clauses)} clauses")
+        logger.info("Clause extraction completed. Found %d clauses", len(clauses))
         
         # Post-process clauses to apply confidence-based needs_review
         for key, clause in clauses.items():
@@ -255,20 +435,22 @@ async def process_lease(
             if hasattr(clause, 'confidence') and clause.confidence < 0.6:
                 if not clause.risk_tags or len(clause.risk_tags) == 0:
                     clause.needs_review = True
-                    logger.info(f"Marked clause {key} for review due to low confidence ({clause.confidence})")
+                    logger.info("Marked clause %s for review due to low confidence (%s)", key, clause.confidence)
         
-        # Check for template document
-        is_template = False
-        for segment in segments:
-            if segment.get("content") and len(segment.get("content", "")) > 100:
-                from app.core.gpt_extract import is_template_lease
-                if is_template_lease(segment.get("content")):
-                    is_template = True
-                    break
+        # Check for template document; placeholder boilerplate lives in the longest
+        # segments, so only sample those instead of scanning every segment
+        longest_segments = heapq.nlargest(
+            TEMPLATE_SAMPLE_SEGMENTS, segments, key=lambda s: len(s.get("content") or "")
+        )
+        is_template = any(
+            _is_template_segment(segment["content"])
+            for segment in longest_segments
+            if len(segment.get("content") or "") > 100
+        )
         
         # If no clauses were extracted at all, create a minimal result
         if not clauses:
-            logger.warning(f"No clauses extracted for lease {lease_id}")
+            logger.warning("No clauses extracted")
             
             # Create a minimal extraction with document info
             clauses = {
@@ -295,35 +477,30 @@ async def process_lease(
                 )
             }
             
-            logger.info(f"Created minimal extraction result for lease {lease_id}")
+            logger.info("Created minimal extraction result")
+        
+        # Dump the clauses once; the same dicts are saved to disk and returned as raw_clauses
+        raw_clauses = type_adapter(Dict[str, ClauseExtraction]).dump_python(clauses)
         
         # Save the extracted clauses
         clauses_file_path = os.path.join(processed_dir, "clauses.json")
-        async with aiofiles.open(clauses_file_path, 'w', encoding='utf-8') as clauses_file:
-            json_data = {}
-            for k, v in clauses.items():
-                # Use model_dump() for Pydantic v2+
-                try:
-                    json_data[k] = v.model_dump()
-                except AttributeError:
-                    # Fallback for Pydantic v1
-                    json_data[k] = v.dict()
-            await clauses_file.write(json.dumps(json_data, indent=2, default=str))
+        async with _atomic_open(clauses_file_path) as clauses_file:
+            await clauses_file.write(_dumps(raw_clauses))
         
         # Analyze risks
-        logger.info(f"Analyzing risks for lease {lease_id}")
-        risk_flags, missing_clauses = analyze_risks(clauses, lease_type)
-        logger.info(f"Risk analysis completed for lease {lease_id}. Found {len(risk_flags)} risks and {len(missing_clauses)} missing clauses")
+        logger.info("Analyzing risks")
+        risk_flags, missing_clauses = await asyncio.to_thread(analyze_risks, clauses, lease_type)
+        logger.info("Risk analysis completed. Found %d risks and %d missing clauses", len(risk_flags), len(missing_clauses))
         
         # Generate summary using the new v2 module
-        logger.info(f"Generating summary for lease {lease_id}")
+        logger.info("Generating summary")
         
         # Convert clauses to chunks format for v2 module
         chunks = convert_clauses_to_chunks(clauses, lease_type)
-        logger.info(f"Converted {len(clauses)} clauses to {len(chunks)} chunks for v2 processing")
+        logger.info("Converted %d clauses to %d chunks for v2 processing", len(clauses), len(chunks))
         
         # Generate markdown summary using v2 module
-        summary_markdown = generate_markdown_summary(chunks)
+        summary_markdown = await asyncio.to_thread(generate_markdown_summary, chunks)
         
         # Generate CSV data for potential export
         csv_data = generate_csv_rows(chunks)
@@ -340,32 +517,23 @@ async def process_lease(
             if hasattr(clause, 'confidence') and clause.confidence:
                 confidence_scores[key] = clause.confidence
         
-        logger.info(f"Summary generation completed for lease {lease_id}")
+        logger.info("Summary generation completed")
         
         # Calculate processing time
         processing_time = time.time() - start_time
-        logger.info(f"Total processing time for lease {lease_id}: {processing_time:.2f} seconds")
+        logger.info("Total processing time: %.2f seconds", processing_time)
         
-        # Save raw clauses for frontend display (convert to dict for serialization)
-        raw_clauses = {}
-        for key, clause in clauses.items():
-            # Use model_dump() for Pydantic v2+
-            try:
-                raw_clauses[key] = clause.model_dump()
-            except AttributeError:
-                # Fallback for Pydantic v1
-                raw_clauses[key] = clause.dict()
-        
-        # Create the response
-        response = ProcessResponse(
+        # Create the response; raw_clauses is attached after dumping since it is already
+        # a dict and would otherwise be validated and dumped again with the model
+        response = trusted(
+            ProcessResponse,
             lease_id=lease_id,
             summary_markdown=summary_markdown,
-            risk_flags=[risk.model_dump() if hasattr(risk, 'model_dump') else risk.dict() for risk in risk_flags],
+            risk_flags=type_adapter(List[RiskFlag]).dump_python(risk_flags),
             traceability=traceability,
             confidence_scores=confidence_scores,
             missing_clauses=missing_clauses,
-            processing_time=processing_time,
-            raw_clauses=raw_clauses  # Include raw extracted clauses for detailed frontend access
+            processing_time=processing_time
         )
         
         # Add enhanced extraction results if available
@@ -381,41 +549,35 @@ async def process_lease(
         
         # Save CSV data for potential export
         csv_file_path = os.path.join(processed_dir, "export.csv")
-        async with aiofiles.open(csv_file_path, 'w', encoding='utf-8') as csv_file:
-            import csv
-            import io
-            
-            # Create CSV content in memory first
-            csv_buffer = io.StringIO()
-            csv_writer = csv.writer(csv_buffer)
-            
-            # Write all rows (headers + data)
-            for row in csv_data:
-                csv_writer.writerow(row)
-            
-            # Write to file
-            await csv_file.write(csv_buffer.getvalue())
+        async with _atomic_open(csv_file_path, 'w', encoding='utf-8', newline='') as csv_file:
+            await _write_csv_rows(csv_file, csv_data)
         
-        # Save the final response
+        # Save the final response last: its presence marks the stored result as complete
         response_file_path = os.path.join(processed_dir, "response.json")
-        async with aiofiles.open(response_file_path, 'w', encoding='utf-8') as response_file:
-            # Convert Pydantic model to dict and then use standard json.dumps
-            try:
-                # Use model_dump() for Pydantic v2+
-                response_dict = response.model_dump(exclude={"raw_clauses"})
-            except AttributeError:
-                # Fallback for Pydantic v1
-                response_dict = response.dict(exclude={"raw_clauses"})
-            await response_file.write(json.dumps(response_dict, indent=2, default=str))
+        # Dump the response once; the stored copy omits raw_clauses, which live in clauses.json
+        response_dict = type_adapter(ProcessResponse).dump_python(response)
+        async with _atomic_open(response_file_path) as response_file:
+            await response_file.write(_dumps({k: v for k, v in response_dict.items() if k != "raw_clauses"}))
+        
+        # Include raw extracted clauses for detailed frontend access
+        response_dict["raw_clauses"] = raw_clauses
         
         # Schedule background tasks (if any)
         background_tasks.add_task(cleanup_temp_files, lease_id, file_path)
         
-        return response
+        # Return the already-dumped dict directly so it is not re-validated and re-encoded
+        return ORJSONResponse(content=response_dict)
         
     except Exception as e:
-        logger.error(f"Error processing lease: {str(e)}", exc_info=True)
+        logger.error("Error processing lease: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing lease: {str(e)}")
+    finally:
+        # Wake any identical uploads waiting on this run; they re-check the stored result
+        if in_flight is not None:
+            _in_flight.pop(lease_id, None)
+            in_flight.set_result(None)
+        if lease_context is not None:
+            lease_id_var.reset(lease_context)
 
 
 @router.post("/process-multi-document")
@@ -433,46 +595,29 @@ async def process_multi_document(
     
     try:
         # Generate a unique ID for this document set
-        doc_set_id = str(uuid.uuid4())
+        doc_set_id = uuid.uuid4().hex
         
         # Create directories
         upload_dir = os.path.join("app", "storage", "uploads", doc_set_id)
         processed_dir = os.path.join("app", "storage", "processed", doc_set_id)
-        os.makedirs(upload_dir, exist_ok=True)
-        os.makedirs(processed_dir, exist_ok=True)
+        await asyncio.gather(
+            aiofiles.os.makedirs(upload_dir, exist_ok=True),
+            aiofiles.os.makedirs(processed_dir, exist_ok=True)
+        )
         
-        # Process each uploaded file
-        documents = []
+        # Save and OCR every uploaded file concurrently
+        results = await asyncio.gather(
+            *(_ingest_document(i, file, upload_dir) for i, file in enumerate(files)),
+            return_exceptions=True
+        )
         
-        for i, file in enumerate(files):
-            # Validate file type
-            file_extension = os.path.splitext(file.filename)[1].lower()
-            if file_extension not in ['.pdf', '.PDF']:
-                continue
-                
-            # Save file
-            file_path = os.path.join(upload_dir, f"doc_{i}_{file.filename}")
-            async with aiofiles.open(file_path, 'wb') as out_file:
-                content = await file.read()
-                await out_file.write(content)
-                
-            # OCR and extract text
-            is_scanned, text_content = await perform_ocr(file_path)
-            
-            # Determine document type from filename or content
-            doc_type = "BASE_LEASE"
-            if "amendment" in file.filename.lower():
-                doc_type = "AMENDMENT"
-            elif "exhibit" in file.filename.lower():
-                doc_type = "EXHIBIT"
-                
-            documents.append({
-                "id": f"doc_{i}",
-                "type": doc_type,
-                "filename": file.filename,
-                "content": text_content,
-                "title": file.filename.rsplit('.', 1)[0]
-            })
+        # Keep successfully ingested documents in their original upload order
+        documents = []
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error("Error ingesting document %s: %s", file.filename, result)
+            elif result:
+                documents.append(result)
             
         # Use enhanced extractor for multi-document processing
         extractor = EnhancedLeaseExtractor(lease_type)
@@ -480,8 +625,8 @@ async def process_multi_document(
         
         # Save results
         result_file_path = os.path.join(processed_dir, "multi_doc_result.json")
-        async with aiofiles.open(result_file_path, 'w', encoding='utf-8') as result_file:
-            await result_file.write(json.dumps(result, indent=2, default=str))
+        async with aiofiles.open(result_file_path, 'wb') as result_file:
+            await result_file.write(_dumps(result))
             
         processing_time = time.time() - start_time
         
@@ -500,6 +645,36 @@ async def process_multi_document(
         raise HTTPException(status_code=500, detail=f"Error processing documents: {str(e)}")
 
 
+async def _ingest_document(index: int, file: UploadFile, upload_dir: str) -> Optional[Dict[str, Any]]:
+    """Save one uploaded document and extract its text; returns None for non-PDF files"""
+    # Validate file type
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in ['.pdf', '.PDF']:
+        return None
+        
+    # Save file
+    file_path = os.path.join(upload_dir, f"doc_{index}_{file.filename}")
+    await _save_upload(file, file_path)
+        
+    # OCR and extract text
+    is_scanned, text_content = await perform_ocr(file_path)
+    
+    # Determine document type from filename or content
+    doc_type = "BASE_LEASE"
+    if "amendment" in file.filename.lower():
+        doc_type = "AMENDMENT"
+    elif "exhibit" in file.filename.lower():
+        doc_type = "EXHIBIT"
+        
+    return {
+        "id": f"doc_{index}",
+        "type": doc_type,
+        "filename": file.filename,
+        "content": text_content,
+        "title": file.filename.rsplit('.', 1)[0]
+    }
+
+
 async def cleanup_temp_files(lease_id: str, file_path: str):
     """Background task to clean up temporary files that are no longer needed"""
     try:
@@ -530,21 +705,14 @@ async def download_csv_export(lease_id: str):
         # Check if the CSV file exists
         csv_file_path = os.path.join("app", "storage", "processed", lease_id, "export.csv")
         
-        if not os.path.exists(csv_file_path):
+        if not await aiofiles.os.path.exists(csv_file_path):
             raise HTTPException(status_code=404, detail="CSV export not found for this lease")
         
-        # Read the CSV file
-        async with aiofiles.open(csv_file_path, 'r', encoding='utf-8') as csv_file:
-            csv_content = await csv_file.read()
-        
-        # Return as downloadable file
-        from fastapi.responses import Response
-        return Response(
-            content=csv_content,
+        # Stream the file straight from disk as a download
+        return FileResponse(
+            csv_file_path,
             media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=lease_{lease_id}_export.csv"
-            }
+            filename=f"lease_{lease_id}_export.csv"
         )
         
     except Exception as e:
@@ -564,26 +732,13 @@ async def get_lease_data(lease_id: str):
         Processed lease data including summary, clauses, risks, etc.
     """
     try:
-        # Check if the processed response file exists
-        response_file_path = os.path.join("app", "storage", "processed", lease_id, "response.json")
+        # Read the processed response together with its raw clauses
+        response_data = await _read_stored_response(os.path.join("app", "storage", "processed", lease_id))
         
-        if not os.path.exists(response_file_path):
+        if response_data is None:
             raise HTTPException(status_code=404, detail="Lease data not found")
         
-        # Read the response file
-        async with aiofiles.open(response_file_path, 'r', encoding='utf-8') as response_file:
-            response_data = json.loads(await response_file.read())
-        
-        # Read the clauses file for raw_clauses
-        clauses_file_path = os.path.join("app", "storage", "processed", lease_id, "clauses.json")
-        raw_clauses = {}
-        
-        if os.path.exists(clauses_file_path):
-            async with aiofiles.open(clauses_file_path, 'r', encoding='utf-8') as clauses_file:
-                raw_clauses = json.loads(await clauses_file.read())
-        
-        # Add raw clauses to response
-        response_data["raw_clauses"] = raw_clauses
+        raw_clauses = response_data["raw_clauses"]
         
         # Extract some key information from clauses for the frontend
         if raw_clauses:
@@ -607,11 +762,12 @@ async def get_lease_data(lease_id: str):
         if "lease_type" not in response_data:
             # Try to read from segments file
             segments_file_path = os.path.join("app", "storage", "processed", lease_id, "segments.json")
-            if os.path.exists(segments_file_path):
+            if await aiofiles.os.path.exists(segments_file_path):
                 # For now, default to "Unknown"
                 response_data["lease_type"] = "Unknown"
         
-        return response_data
+        # The data is already plain JSON types, so skip FastAPI's jsonable_encoder pass
+        return ORJSONResponse(content=response_data)
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Lease data not found")
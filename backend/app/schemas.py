@@ -1,9 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import List, Optional, Dict, Any, Union, Type, TypeVar
 from enum import Enum
+from functools import lru_cache
 from datetime import datetime
 import uuid
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 class LeaseType(str, Enum):
     RETAIL = "retail"
     OFFICE = "office"
@@ -52,10 +55,14 @@ class FeedbackRequest(BaseModel):
     additional_notes: Optional[str] = None
     
 class FeedbackResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     success: bool
     feedback_id: str
     
 class RiskFlag(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     clause_key: str
     clause_name: str
     level: RiskLevel
@@ -65,6 +72,9 @@ class RiskFlag(BaseModel):
     page_number: Optional[int] = None
     
 class ClauseExtraction(BaseModel):
+    # Not frozen: extractors and process_lease update clauses after construction
+    model_config = ConfigDict(extra='ignore', validate_assignment=False)
+    
     content: str
     raw_excerpt: str
     confidence: float
@@ -80,6 +90,8 @@ class ClauseExtraction(BaseModel):
     detection_method: Optional[str] = None  # How the clause was detected/reconciled
     
 class LeaseSummary(BaseModel):
+    model_config = ConfigDict(extra='ignore', validate_assignment=False)
+    
     lease_id: str
     lease_type: LeaseType
     processed_at: datetime = Field(default_factory=datetime.now)
@@ -99,3 +111,21 @@ class LeaseSummary(BaseModel):
     risk_flags: List[Dict[str, Any]]
     missing_clauses: List[str]
     traceability: Dict[str, Any]
+
+
+def trusted(cls: Type[ModelT], **data: Any) -> ModelT:
+    """
+    Build a model from data produced inside the backend without re-running validation.
+    Only use this for values the pipeline built itself; request bodies and GPT output
+    must still go through normal validation.
+    """
+    return cls.model_construct(**data)
+
+
+@lru_cache(maxsize=512)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """
+    Get a TypeAdapter for a type, built once and reused.
+    Constructing a TypeAdapter compiles a new core schema, so avoid doing it per call.
+    """
+    return TypeAdapter(tp)
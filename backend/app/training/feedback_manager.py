@@ -1,10 +1,284 @@
 import os
-import json
+import mmap
+import orjson
+import asyncio
 import datetime
-from typing import Optional, Dict, Any
+import tempfile
+from collections import defaultdict, Counter, deque
+from typing import Optional, Dict, Any, List, Set, Tuple
 import aiofiles
 from app.utils.logger import logger
 
+FEEDBACK_DIR = os.path.join("app", "storage", "feedback")
+FEEDBACK_BATCH_SIZE = 100
+CONSOLIDATED_FILE = os.path.join(FEEDBACK_DIR, "consolidated_feedback.jsonl")
+FIELD_INDEX_FILE = os.path.join(FEEDBACK_DIR, "field_offsets.json")
+STATS_FILE = os.path.join(FEEDBACK_DIR, "stats.json")
+STATS_LEASES_FILE = os.path.join(FEEDBACK_DIR, "stats_leases.json")
+RECENT_FEEDBACK_COUNT = 10
+# Persist the field index every this many batches, so an unclean shutdown only rescans the tail
+FIELD_INDEX_SAVE_BATCHES = 20
+APPEND_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+
+
+class FeedbackWriter:
+    """
+    Append-only batching writer for feedback records.
+    store_feedback enqueues a record and waits for it to be written; a background task
+    drains the queue in batches and appends each batch to every sink with a single
+    write, so concurrent submissions share one write (group commit).
+    """
+    
+    def __init__(self, batch_size: int = FEEDBACK_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        # Running statistics, loaded on first write and persisted after every batch
+        self._stats_loaded = False
+        self._total = 0
+        self._field_counts = Counter()
+        self._recent = deque(maxlen=RECENT_FEEDBACK_COUNT)
+        self._lease_ids = set()
+        self._leases_dirty = False
+        
+        # field_id -> [(byte offset, length)] of its records in the consolidated file,
+        # and how many bytes of that file the index covers
+        self._field_offsets: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        self._indexed_size = 0
+        self._batches_since_index_save = 0
+        
+        # Append-only descriptor for the consolidated log, held open while the writer runs
+        self._consolidated_fd: Optional[int] = None
+        
+        # Serializes batch writes: the appends, the offset bookkeeping and the
+        # read-modify-write of stats.json, stats_leases.json and the field index
+        self._lock = asyncio.Lock()
+        
+    def start(self):
+        """Start the background drain task (called on app startup)"""
+        if self._task is None:
+            _ensure_dir(FEEDBACK_DIR)
+            self._consolidated_fd = os.open(CONSOLIDATED_FILE, APPEND_FLAGS, 0o644)
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+            
+    async def stop(self):
+        """Flush any queued feedback and stop the drain task (called on app shutdown)"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        os.close(self._consolidated_fd)
+        self._consolidated_fd = None
+        
+        # Persist the field index so the next start only scans records appended after it
+        async with self._lock:
+            await self._save_field_index()
+            
+    async def field_spans(self, field_id: str) -> List[Tuple[int, int]]:
+        """Get the (offset, length) spans of a field's records in the consolidated file"""
+        # Copy under the lock so a batch being written cannot change the index mid-read
+        async with self._lock:
+            if self._field_offsets is None:
+                await self._load_field_index()
+            return list(self._field_offsets.get(field_id, ()))
+        
+    async def enqueue(self, feedback_data: Dict[str, Any]):
+        """
+        Write a feedback record, returning once it is on disk. Records submitted
+        concurrently are written together in one batch; a failed write raises here.
+        Writes the record directly if the writer is not running.
+        """
+        if self._task is None:
+            await self._write_batch([feedback_data])
+            return
+        
+        written = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((feedback_data, written))
+        await written
+            
+    async def _run(self):
+        while True:
+            # Wait for one record, then take whatever else queued up while the last batch was written
+            pending = [await self._queue.get()]
+            while len(pending) < self.batch_size and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            try:
+                await self._write_batch([feedback_data for feedback_data, _ in pending])
+            except Exception as e:
+                logger.error("Error writing feedback batch: %s", e)
+                # Fail every submitter in the batch rather than dropping their records silently
+                for _, written in pending:
+                    if not written.done():
+                        written.set_exception(e)
+            else:
+                for _, written in pending:
+                    if not written.done():
+                        written.set_result(None)
+            finally:
+                for _ in pending:
+                    self._queue.task_done()
+                    
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        async with self._lock:
+            await self._write_batch_locked(batch)
+            
+    async def _write_batch_locked(self, batch: List[Dict[str, Any]]):
+        # Load the statistics before appending so this batch is not counted twice
+        if not self._stats_loaded:
+            await self._load_stats()
+        if self._field_offsets is None:
+            await self._load_field_index()
+            
+        # Serialize each record once and group the lines by sink
+        consolidated_lines = []
+        lease_lines = defaultdict(list)
+        
+        for feedback_data in batch:
+            line = orjson.dumps(feedback_data) + b"\n"
+            consolidated_lines.append(line)
+            lease_lines[feedback_data["lease_id"]].append(line)
+            
+        # Save each feedback to its own JSON file, and append to the consolidated
+        # file and each lease's history, all in one hop to a worker thread
+        feedback_files = [
+            (os.path.join(FEEDBACK_DIR, feedback_data["lease_id"], f"{feedback_data['feedback_id']}.json"),
+             orjson.dumps(feedback_data, option=orjson.OPT_INDENT_2))
+            for feedback_data in batch
+        ]
+        history_appends = {
+            os.path.join(FEEDBACK_DIR, lease_id, "feedback_history.jsonl"): b"".join(lines)
+            for lease_id, lines in lease_lines.items()
+        }
+        offset = await asyncio.to_thread(
+            _write_sinks, feedback_files, b"".join(consolidated_lines), history_appends, self._consolidated_fd
+        )
+            
+        # Index where each record landed so lookups by field can read just those bytes
+        for feedback_data, line in zip(batch, consolidated_lines):
+            self._field_offsets[feedback_data["field_id"]].append((offset, len(line)))
+            offset += len(line)
+        self._indexed_size = offset
+        
+        self._batches_since_index_save += 1
+        if self._batches_since_index_save >= FIELD_INDEX_SAVE_BATCHES:
+            await self._save_field_index()
+                
+        await self._update_stats(batch)
+        
+        logger.info("Stored %d feedback records", len(batch))
+        
+    async def _load_stats(self):
+        if os.path.exists(STATS_FILE) and os.path.exists(STATS_LEASES_FILE):
+            async with aiofiles.open(STATS_FILE, 'rb') as f:
+                stats = orjson.loads(await f.read())
+            async with aiofiles.open(STATS_LEASES_FILE, 'rb') as f:
+                lease_ids = orjson.loads(await f.read())
+        else:
+            # First run with incremental statistics: build them from the existing feedback once
+            stats, lease_ids = await _scan_feedback_statistics()
+            self._leases_dirty = True
+            
+        self._total = stats["total_feedback_count"]
+        self._field_counts = Counter(stats["field_counts"])
+        self._recent = deque(stats["recent_feedback"], maxlen=RECENT_FEEDBACK_COUNT)
+        self._lease_ids = set(lease_ids)
+        self._stats_loaded = True
+        
+    async def _load_field_index(self):
+        # Called with the write lock held
+        self._field_offsets, self._indexed_size = await asyncio.to_thread(_build_field_index)
+        
+    async def _save_field_index(self):
+        # Called with the write lock held
+        if self._field_offsets is not None:
+            await _write_json_atomic(FIELD_INDEX_FILE, {
+                "size": self._indexed_size,
+                "offsets": self._field_offsets
+            })
+        self._batches_since_index_save = 0
+        
+    async def _update_stats(self, batch: List[Dict[str, Any]]):
+        # Called from _write_batch with the write lock held
+        for feedback_data in batch:
+            self._total += 1
+            self._field_counts[_field_type(feedback_data.get("field_id", "unknown"))] += 1
+            self._recent.append(_recent_entry(feedback_data))
+            if feedback_data["lease_id"] not in self._lease_ids:
+                self._lease_ids.add(feedback_data["lease_id"])
+                self._leases_dirty = True
+                
+        # The lease ID list only changes when feedback arrives for a new lease
+        if self._leases_dirty:
+            await _write_json_atomic(STATS_LEASES_FILE, sorted(self._lease_ids))
+            self._leases_dirty = False
+            
+        await _write_json_atomic(STATS_FILE, {
+            "total_feedback_count": self._total,
+            "lease_count": len(self._lease_ids),
+            "field_counts": dict(self._field_counts),
+            "recent_feedback": list(self._recent)
+        })
+
+
+# Directories already created by this process, so repeat feedback for a lease skips the stat
+_created_dirs: Set[str] = set()
+
+
+def _ensure_dir(dir_path: str):
+    if dir_path not in _created_dirs:
+        os.makedirs(dir_path, exist_ok=True)
+        _created_dirs.add(dir_path)
+
+
+def _append_fd(fd: int, data: bytes) -> int:
+    """Append bytes to an O_APPEND descriptor and return the offset they were written at"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+    return os.lseek(fd, 0, os.SEEK_CUR) - len(data)
+
+
+def _append(file_path: str, data: bytes) -> int:
+    """Append bytes to a file through a raw O_APPEND descriptor"""
+    fd = os.open(file_path, APPEND_FLAGS, 0o644)
+    try:
+        return _append_fd(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _write_sinks(feedback_files: List[Tuple[str, bytes]], consolidated_data: bytes,
+                 history_appends: Dict[str, bytes], consolidated_fd: Optional[int] = None) -> int:
+    """Write one batch to every feedback sink; returns the batch's offset in the consolidated file"""
+    _ensure_dir(FEEDBACK_DIR)
+    for history_file in history_appends:
+        _ensure_dir(os.path.dirname(history_file))
+        
+    for feedback_file, data in feedback_files:
+        with open(feedback_file, 'wb') as f:
+            f.write(data)
+            
+    if consolidated_fd is not None:
+        offset = _append_fd(consolidated_fd, consolidated_data)
+    else:
+        offset = _append(CONSOLIDATED_FILE, consolidated_data)
+    
+    for history_file, data in history_appends.items():
+        _append(history_file, data)
+        
+    return offset
+
+
+feedback_writer = FeedbackWriter()
+
+
 async def store_feedback(
     feedback_id: str,
     lease_id: str,
@@ -18,16 +292,9 @@ async def store_feedback(
     """
     Store user feedback for future training and improvement.
     The field_id provides clear traceability to the exact data field/clause.
+    Returns once the record is written, so reads issued afterwards include it.
     """
     try:
-        # Create the feedback directory if it doesn't exist
-        feedback_dir = os.path.join("app", "storage", "feedback")
-        os.makedirs(feedback_dir, exist_ok=True)
-        
-        # Create the lease feedback directory if it doesn't exist
-        lease_feedback_dir = os.path.join(feedback_dir, lease_id)
-        os.makedirs(lease_feedback_dir, exist_ok=True)
-        
         # Create feedback data with enhanced structure
         feedback_data = {
             "feedback_id": feedback_id,
@@ -41,63 +308,31 @@ async def store_feedback(
             "timestamp": datetime.datetime.now().isoformat()
         }
         
-        # Save feedback to a JSON file
-        feedback_file = os.path.join(lease_feedback_dir, f"{feedback_id}.json")
-        async with aiofiles.open(feedback_file, 'w') as f:
-            await f.write(json.dumps(feedback_data, indent=2))
-            
-        # Also append to a consolidated feedback file for easier processing
-        consolidated_file = os.path.join(feedback_dir, "consolidated_feedback.jsonl")
-        async with aiofiles.open(consolidated_file, 'a') as f:
-            await f.write(json.dumps(feedback_data) + "\n")
-        
-        # Also create a field-specific consolidated file to track changes to the same field across leases
-        field_file = os.path.join(feedback_dir, f"field_{field_id.replace('.', '_')}.jsonl") 
-        async with aiofiles.open(field_file, 'a') as f:
-            await f.write(json.dumps(feedback_data) + "\n")
-            
-        logger.info(f"Stored feedback {feedback_id} for lease {lease_id}, field {field_id}")
+        # Hand the record to the batching writer and wait for its batch to be written
+        await feedback_writer.enqueue(feedback_data)
         
-        # Track the feedback history for this particular lease
-        await update_lease_feedback_history(lease_id, feedback_data)
+        logger.info("Stored feedback %s for lease %s, field %s", feedback_id, lease_id, field_id)
         
         return True
         
     except Exception as e:
-        logger.error(f"Error storing feedback: {str(e)}")
+        logger.error("Error storing feedback: %s", e)
         raise
 
 
-async def update_lease_feedback_history(lease_id: str, feedback_data: Dict[str, Any]):
-    """Maintain a history of all feedback for a specific lease"""
-    try:
-        history_file = os.path.join("app", "storage", "feedback", lease_id, "feedback_history.jsonl")
-        
-        async with aiofiles.open(history_file, 'a') as f:
-            await f.write(json.dumps(feedback_data) + "\n")
-            
-    except Exception as e:
-        logger.error(f"Error updating lease feedback history: {str(e)}")
-
-
 async def get_lease_feedback(lease_id: str):
     """Get all feedback for a specific lease"""
     try:
-        feedback_list = []
-        
-        # Check if the lease feedback directory exists
-        lease_feedback_dir = os.path.join("app", "storage", "feedback", lease_id)
-        if not os.path.exists(lease_feedback_dir):
+        # The lease history holds every feedback record for the lease in one file;
+        # the per-feedback JSON files are kept for archival only
+        history_file = os.path.join(FEEDBACK_DIR, lease_id, "feedback_history.jsonl")
+        if not os.path.exists(history_file):
             return []
             
-        # Get all feedback files for this lease
-        for filename in os.listdir(lease_feedback_dir):
-            if filename.endswith(".json") and filename != "feedback_history.jsonl":
-                file_path = os.path.join(lease_feedback_dir, filename)
-                async with aiofiles.open(file_path, 'r') as f:
-                    content = await f.read()
-                    feedback_data = json.loads(content)
-                    feedback_list.append(feedback_data)
+        feedback_list = []
+        async with aiofiles.open(history_file, 'rb') as f:
+            async for line in f:
+                feedback_list.append(orjson.loads(line))
                     
         # Sort by timestamp
         feedback_list.sort(key=lambda x: x.get("timestamp", ""))
@@ -105,26 +340,59 @@ async def get_lease_feedback(lease_id: str):
         return feedback_list
         
     except Exception as e:
-        logger.error(f"Error retrieving feedback for lease {lease_id}: {str(e)}")
+        logger.error("Error retrieving feedback for lease %s: %s", lease_id, e)
         return []
 
 
+def _build_field_index() -> Tuple[Dict[str, List[Tuple[int, int]]], int]:
+    """
+    Load the persisted field index and extend it with any records appended to the
+    consolidated file since it was saved (or index the whole file if there is none)
+    """
+    field_offsets = defaultdict(list)
+    indexed_size = 0
+    
+    log_size = os.path.getsize(CONSOLIDATED_FILE) if os.path.exists(CONSOLIDATED_FILE) else 0
+    
+    if os.path.exists(FIELD_INDEX_FILE):
+        with open(FIELD_INDEX_FILE, 'rb') as f:
+            index_data = orjson.loads(f.read())
+        # A log smaller than the index covers was truncated or restored, so its
+        # offsets no longer match; rebuild the index from scratch
+        if index_data["size"] <= log_size:
+            indexed_size = index_data["size"]
+            for field_id, spans in index_data["offsets"].items():
+                field_offsets[field_id] = [tuple(span) for span in spans]
+        else:
+            logger.warning("Feedback log is smaller than its field index; rebuilding the index")
+            
+    if log_size > indexed_size:
+        with open(CONSOLIDATED_FILE, 'rb') as f:
+            f.seek(indexed_size)
+            for line in f:
+                feedback_data = orjson.loads(line)
+                field_offsets[feedback_data.get("field_id", "unknown")].append((indexed_size, len(line)))
+                indexed_size += len(line)
+                
+    return field_offsets, indexed_size
+
+
+def _read_spans(file_path: str, spans: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """Parse the JSON records at the given byte spans of a file"""
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [orjson.loads(mm[offset:offset + length]) for offset, length in spans]
+
+
 async def get_feedback_by_field_id(field_id: str):
     """Get all feedback history for a specific field across all leases"""
     try:
-        feedback_list = []
-        
-        # Check if the field-specific feedback file exists
-        field_file = os.path.join("app", "storage", "feedback", f"field_{field_id.replace('.', '_')}.jsonl")
-        if not os.path.exists(field_file):
+        # Look up where this field's records live in the consolidated file
+        spans = await feedback_writer.field_spans(field_id)
+        if not spans:
             return []
             
-        # Read all feedback for this field
-        async with aiofiles.open(field_file, 'r') as f:
-            lines = await f.readlines()
-            for line in lines:
-                feedback_data = json.loads(line.strip())
-                feedback_list.append(feedback_data)
+        # Read only those records
+        feedback_list = await asyncio.to_thread(_read_spans, CONSOLIDATED_FILE, spans)
                     
         # Sort by timestamp
         feedback_list.sort(key=lambda x: x.get("timestamp", ""))
@@ -132,65 +400,93 @@ async def get_feedback_by_field_id(field_id: str):
         return feedback_list
         
     except Exception as e:
-        logger.error(f"Error retrieving feedback for field {field_id}: {str(e)}")
+        logger.error("Error retrieving feedback for field %s: %s", field_id, e)
         return []
 
 
-async def get_feedback_statistics():
-    """Get statistics about collected feedback"""
+def _field_type(field_id: str) -> str:
+    """Get the base field type (before the dot)"""
+    return field_id.partition(".")[0]
+
+
+def _recent_entry(feedback_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "feedback_id": feedback_data.get("feedback_id"),
+        "lease_id": feedback_data.get("lease_id"),
+        "field_id": feedback_data.get("field_id"),
+        "timestamp": feedback_data.get("timestamp")
+    }
+
+
+async def _write_json_atomic(file_path: str, data: Any):
+    """Write JSON to a temp file and swap it in so readers never see a partial file"""
+    # A unique temp file per write, in the same directory so os.replace stays atomic
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    os.close(fd)
     try:
-        # Initialize statistics
-        stats = {
-            "total_feedback_count": 0,
-            "lease_count": 0,
-            "field_counts": {},
-            "recent_feedback": []
-        }
-        
-        # Check if the feedback directory exists
-        feedback_dir = os.path.join("app", "storage", "feedback")
-        if not os.path.exists(feedback_dir):
-            return stats
-            
-        # Count unique leases
-        lease_dirs = [d for d in os.listdir(feedback_dir) 
-                     if os.path.isdir(os.path.join(feedback_dir, d)) and d != "field_specific"]
+        async with aiofiles.open(temp_path, 'wb') as f:
+            await f.write(orjson.dumps(data))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+async def _scan_feedback_statistics() -> Tuple[Dict[str, Any], List[str]]:
+    """Compute feedback statistics from the raw feedback files"""
+    # Initialize statistics
+    stats = {
+        "total_feedback_count": 0,
+        "lease_count": 0,
+        "field_counts": {},
+        "recent_feedback": []
+    }
+    
+    # Check if the feedback directory exists
+    if not os.path.exists(FEEDBACK_DIR):
+        return stats, []
         
-        stats["lease_count"] = len(lease_dirs)
+    # Count unique leases
+    with os.scandir(FEEDBACK_DIR) as entries:
+        lease_dirs = [entry.name for entry in entries
+                      if entry.is_dir(follow_symlinks=False) and entry.name != "field_specific"]
+    
+    stats["lease_count"] = len(lease_dirs)
+    
+    # Process consolidated feedback
+    if os.path.exists(CONSOLIDATED_FILE):
+        total_count = 0
+        recent_feedback = deque(maxlen=RECENT_FEEDBACK_COUNT)
+        field_counts = Counter()
         
-        # Process consolidated feedback
-        consolidated_file = os.path.join(feedback_dir, "consolidated_feedback.jsonl")
-        if os.path.exists(consolidated_file):
-            async with aiofiles.open(consolidated_file, 'r') as f:
-                lines = await f.readlines()
-                
-                stats["total_feedback_count"] = len(lines)
+        # Stream the file once, keeping only the counts and the most recent records
+        async with aiofiles.open(CONSOLIDATED_FILE, 'rb') as f:
+            async for line in f:
+                feedback_data = orjson.loads(line)
+                total_count += 1
+                recent_feedback.append(feedback_data)
+                field_counts[_field_type(feedback_data.get("field_id", "unknown"))] += 1
                 
-                # Process the most recent feedback (last 10)
-                for line in lines[-10:]:
-                    feedback_data = json.loads(line.strip())
-                    stats["recent_feedback"].append({
-                        "feedback_id": feedback_data.get("feedback_id"),
-                        "lease_id": feedback_data.get("lease_id"),
-                        "field_id": feedback_data.get("field_id"),
-                        "timestamp": feedback_data.get("timestamp")
-                    })
+        stats["total_feedback_count"] = total_count
+        stats["recent_feedback"] = [_recent_entry(feedback_data) for feedback_data in recent_feedback]
+        stats["field_counts"] = dict(field_counts)
+    
+    return stats, lease_dirs
+
+
+async def get_feedback_statistics():
+    """Get statistics about collected feedback"""
+    try:
+        # Statistics are kept up to date by the feedback writer
+        if os.path.exists(STATS_FILE):
+            async with aiofiles.open(STATS_FILE, 'rb') as f:
+                return orjson.loads(await f.read())
                 
-                # Count feedback by field type
-                for line in lines:
-                    feedback_data = json.loads(line.strip())
-                    field_id = feedback_data.get("field_id", "unknown")
-                    
-                    # Get the base field type (before the dot)
-                    field_type = field_id.split(".")[0] if "." in field_id else field_id
-                    
-                    if field_type not in stats["field_counts"]:
-                        stats["field_counts"][field_type] = 0
-                        
-                    stats["field_counts"][field_type] += 1
-        
+        # No stats file yet, so compute them from the feedback files
+        stats, _ = await _scan_feedback_statistics()
         return stats
         
     except Exception as e:
-        logger.error(f"Error retrieving feedback statistics: {str(e)}")
+        logger.error("Error retrieving feedback statistics: %s", e)
         return {"error": str(e)}
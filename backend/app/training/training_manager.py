@@ -1,9 +1,13 @@
 import os
-import json
-import glob
-from typing import List, Dict, Any
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Set, Iterable, Iterator, Optional, Tuple
 from app.utils.logger import logger
 
+# Per-lease files under processed/ that training examples are built from
+TRAINING_ARTIFACTS = {"text.txt", "segments.json", "response.json"}
+
 class TrainingManager:
     """
     Manages the collection and preparation of training data for improving
@@ -28,20 +32,34 @@ class TrainingManager:
         try:
             logger.info("Starting training dataset generation")
             
-            # Collect all consolidated feedback
-            feedback_data = self._collect_feedback()
-            logger.info(f"Collected {len(feedback_data)} feedback entries")
-            
-            # Organize feedback by lease
-            feedback_by_lease = self._organize_feedback_by_lease(feedback_data)
+            # Stream all consolidated feedback and organize it by lease
+            feedback_by_lease = self._organize_feedback_by_lease(self._collect_feedback())
+            logger.info("Collected %d feedback entries", sum(len(feedback_list) for feedback_list in feedback_by_lease.values()))
             
-            # Generate extraction training examples
-            extraction_examples = self._generate_extraction_examples(feedback_by_lease)
-            logger.info(f"Generated {len(extraction_examples)} extraction examples")
+            # Index which artifacts exist for each processed lease
+            processed_index = self._index_processed()
             
-            # Generate summarization training examples
-            summarization_examples = self._generate_summarization_examples(feedback_by_lease)
-            logger.info(f"Generated {len(summarization_examples)} summarization examples")
+            # Generate extraction and summarization examples, one lease per task across worker processes
+            lease_jobs = [
+                (lease_id, feedback_list, processed_index.get(lease_id, set()))
+                for lease_id, feedback_list in feedback_by_lease.items()
+            ]
+            extraction_examples = []
+            summarization_examples = []
+            if not lease_jobs:
+                # Nothing to process, so skip starting the worker pool; the empty
+                # datasets are still saved so no stale examples are left behind
+                logger.info("No feedback to generate training examples from")
+            else:
+                with ProcessPoolExecutor() as executor:
+                    lease_results = executor.map(
+                        partial(_process_lease, processed_dir=self.processed_dir), lease_jobs, chunksize=16
+                    )
+                    for lease_extraction, lease_summarization in lease_results:
+                        extraction_examples.extend(lease_extraction)
+                        summarization_examples.extend(lease_summarization)
+            logger.info("Generated %d extraction examples", len(extraction_examples))
+            logger.info("Generated %d summarization examples", len(summarization_examples))
             
             # Save training datasets
             self._save_training_dataset(extraction_examples, "extraction_examples.jsonl")
@@ -51,26 +69,23 @@ class TrainingManager:
             return True
             
         except Exception as e:
-            logger.error(f"Error generating training dataset: {str(e)}")
+            logger.error("Error generating training dataset: %s", e)
             return False
     
-    def _collect_feedback(self) -> List[Dict[str, Any]]:
-        """Collect all feedback from the consolidated file"""
-        feedback_data = []
-        
+    def _collect_feedback(self) -> Iterator[Dict[str, Any]]:
+        """Yield all feedback from the consolidated file, one record at a time"""
         consolidated_file = os.path.join(self.feedback_dir, "consolidated_feedback.jsonl")
         if os.path.exists(consolidated_file):
-            with open(consolidated_file, 'r') as f:
+            with open(consolidated_file, 'rb') as f:
                 for line in f:
                     try:
-                        feedback = json.loads(line.strip())
-                        feedback_data.append(feedback)
-                    except json.JSONDecodeError:
-                        logger.warning(f"Invalid JSON in feedback file: {line}")
-        
-        return feedback_data
+                        feedback = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        logger.warning("Invalid JSON in feedback file: %r", line)
+                        continue
+                    yield feedback
     
-    def _organize_feedback_by_lease(self, feedback_data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def _organize_feedback_by_lease(self, feedback_data: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """Organize feedback by lease ID"""
         feedback_by_lease = {}
         
@@ -83,137 +98,34 @@ class TrainingManager:
         
         return feedback_by_lease
     
-    def _generate_extraction_examples(self, feedback_by_lease: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-        """Generate examples for improving the extraction model"""
-        extraction_examples = []
+    def _index_processed(self) -> Dict[str, Set[str]]:
+        """Map each processed lease ID to the set of training artifacts stored for it"""
+        processed_index = {}
         
-        for lease_id, feedback_list in feedback_by_lease.items():
-            # Try to get the original text for this lease
-            text_path = os.path.join(self.processed_dir, lease_id, "text.txt")
-            if not os.path.exists(text_path):
-                logger.warning(f"Original text not found for lease {lease_id}")
-                continue
-                
-            with open(text_path, 'r') as f:
-                original_text = f.read()
-                
-            # Get the segments for this lease
-            segments_path = os.path.join(self.processed_dir, lease_id, "segments.json")
-            if not os.path.exists(segments_path):
-                logger.warning(f"Segments not found for lease {lease_id}")
-                continue
-                
-            with open(segments_path, 'r') as f:
-                segments = json.load(f)
-                
-            # Create extraction examples from feedback
-            for feedback in feedback_list:
-                field = feedback.get("field")
-                original = feedback.get("original")
-                corrected = feedback.get("corrected")
-                
-                # Find the relevant segment for this field
-                relevant_segment = None
-                for segment in segments:
-                    # Check if field name is related to this segment
-                    segment_name = segment.get("section_name", "").lower()
-                    field_lower = field.lower()
-                    
-                    if segment_name in field_lower or any(
-                        term in field_lower for term in segment_name.split("_")
-                    ):
-                        relevant_segment = segment
-                        break
-                
-                if relevant_segment:
-                    example = {
-                        "lease_id": lease_id,
-                        "field": field,
-                        "segment_name": relevant_segment.get("section_name"),
-                        "segment_content": relevant_segment.get("content"),
-                        "original_extraction": original,
-                        "corrected_extraction": corrected,
-                        "timestamp": feedback.get("timestamp")
+        with os.scandir(self.processed_dir) as lease_entries:
+            for lease_entry in lease_entries:
+                if not lease_entry.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(lease_entry.path) as artifact_entries:
+                    processed_index[lease_entry.name] = {
+                        entry.name for entry in artifact_entries if entry.name in TRAINING_ARTIFACTS
                     }
-                    extraction_examples.append(example)
-        
-        return extraction_examples
-    
-    def _generate_summarization_examples(self, feedback_by_lease: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-        """Generate examples for improving the summarization model"""
-        summarization_examples = []
-        
-        for lease_id, feedback_list in feedback_by_lease.items():
-            # Try to get the response data for this lease
-            response_path = os.path.join(self.processed_dir, lease_id, "response.json")
-            if not os.path.exists(response_path):
-                logger.warning(f"Response data not found for lease {lease_id}")
-                continue
-                
-            with open(response_path, 'r') as f:
-                response_data = json.load(f)
-                
-            # Get the original summary
-            original_summary = response_data.get("summary_markdown", "")
-            
-            # Create a modified summary incorporating all feedback
-            modified_summary = original_summary
-            
-            # Track all modifications to avoid conflicts
-            modifications = []
-            
-            for feedback in feedback_list:
-                field = feedback.get("field")
-                original = feedback.get("original")
-                corrected = feedback.get("corrected")
-                
-                # Try to find and replace the content in the summary
-                if original in modified_summary:
-                    # Check if this section overlaps with previous modifications
-                    overlap = False
-                    for start, end in modifications:
-                        orig_start = modified_summary.find(original)
-                        orig_end = orig_start + len(original)
-                        
-                        if (orig_start <= start and orig_end > start) or (orig_start < end and orig_end >= end):
-                            overlap = True
-                            break
-                    
-                    if not overlap:
-                        # Track this modification
-                        orig_start = modified_summary.find(original)
-                        orig_end = orig_start + len(original)
-                        modifications.append((orig_start, orig_end))
-                        
-                        # Apply the modification
-                        modified_summary = modified_summary.replace(original, corrected)
-            
-            # Create a summarization example
-            if modified_summary != original_summary:
-                example = {
-                    "lease_id": lease_id,
-                    "original_summary": original_summary,
-                    "corrected_summary": modified_summary,
-                    "feedback_count": len(feedback_list),
-                    "timestamp": max(feedback.get("timestamp", "") for feedback in feedback_list)
-                }
-                summarization_examples.append(example)
         
-        return summarization_examples
+        return processed_index
     
     def _save_training_dataset(self, examples: List[Dict[str, Any]], filename: str):
-        """Save training examples to a JSONL file"""
+        """Save training examples to a JSONL file, replacing any previous dataset"""
         if not examples:
-            logger.warning(f"No examples to save for {filename}")
-            return
+            # Still truncate the file so examples from an earlier run are not reused
+            logger.warning("No examples to save for %s", filename)
             
         output_path = os.path.join(self.training_dir, filename)
         
-        with open(output_path, 'w') as f:
+        with open(output_path, 'wb') as f:
             for example in examples:
-                f.write(json.dumps(example) + "\n")
+                f.write(orjson.dumps(example) + b"\n")
                 
-        logger.info(f"Saved {len(examples)} examples to {output_path}")
+        logger.info("Saved %d examples to %s", len(examples), output_path)
     
     def bulk_process_leases(self, input_dir: str):
         """
@@ -225,5 +137,120 @@ class TrainingManager:
         # 2. Process each one using the extraction pipeline
         # 3. Store the results for future training
         # For simplicity, we'll just log a placeholder message
-        logger.info(f"Bulk processing of leases from {input_dir} would go here")
+        logger.info("Bulk processing of leases from %s would go here", input_dir)
         return True
+
+
+def _extraction_examples_for_lease(lease_id: str, feedback_list: List[Dict[str, Any]],
+                                   processed_dir: str, artifacts: Set[str]) -> List[Dict[str, Any]]:
+    """Generate examples for improving the extraction model from one lease's feedback"""
+    # The original text is not used for examples, but its presence marks a fully processed lease
+    if "text.txt" not in artifacts:
+        logger.warning("Original text not found for lease %s", lease_id)
+        return []
+        
+    # Get the segments for this lease
+    segments_path = os.path.join(processed_dir, lease_id, "segments.json")
+    if "segments.json" not in artifacts:
+        logger.warning("Segments not found for lease %s", lease_id)
+        return []
+        
+    with open(segments_path, 'rb') as f:
+        segments = orjson.loads(f.read())
+        
+    # Lowercase each section name and split its terms once per lease
+    segment_index = []
+    for segment in segments:
+        segment_name = (segment.get("section_name") or "").lower()
+        segment_index.append((segment, segment_name, tuple(segment_name.split("_"))))
+        
+    # Create extraction examples from feedback
+    extraction_examples = []
+    for feedback in feedback_list:
+        # Stored feedback records the clause as field_id
+        field = feedback.get("field") or feedback.get("field_id") or ""
+        original = feedback.get("original")
+        corrected = feedback.get("corrected")
+        field_lower = field.lower()
+        
+        # Find the relevant segment for this field
+        relevant_segment = None
+        for segment, segment_name, segment_terms in segment_index:
+            # Check if field name is related to this segment
+            if segment_name in field_lower or any(term in field_lower for term in segment_terms):
+                relevant_segment = segment
+                break
+        
+        if relevant_segment:
+            example = {
+                "lease_id": lease_id,
+                "field": field,
+                "segment_name": relevant_segment.get("section_name"),
+                "segment_content": relevant_segment.get("content"),
+                "original_extraction": original,
+                "corrected_extraction": corrected,
+                "timestamp": feedback.get("timestamp")
+            }
+            extraction_examples.append(example)
+            
+    return extraction_examples
+
+
+def _summarization_example_for_lease(lease_id: str, feedback_list: List[Dict[str, Any]],
+                                     processed_dir: str, artifacts: Set[str]) -> Optional[Dict[str, Any]]:
+    """Generate an example for improving the summarization model from one lease's feedback"""
+    # Try to get the response data for this lease
+    response_path = os.path.join(processed_dir, lease_id, "response.json")
+    if "response.json" not in artifacts:
+        logger.warning("Response data not found for lease %s", lease_id)
+        return None
+        
+    with open(response_path, 'rb') as f:
+        response_data = orjson.loads(f.read())
+        
+    # Get the original summary
+    original_summary = response_data.get("summary_markdown", "")
+    
+    # Locate each correction in the original summary as a (start, end, replacement) edit
+    edits = []
+    for feedback in feedback_list:
+        original = feedback.get("original")
+        if not original:
+            continue
+        start = original_summary.find(original)
+        if start >= 0:
+            edits.append((start, start + len(original), feedback.get("corrected") or ""))
+    
+    # Keep edits in order of position, skipping any that overlap one already kept,
+    # then splice the kept replacements in a single pass
+    edits.sort(key=lambda edit: edit[0])
+    parts = []
+    last_end = 0
+    for start, end, replacement in edits:
+        if start >= last_end:
+            parts.append(original_summary[last_end:start])
+            parts.append(replacement)
+            last_end = end
+    parts.append(original_summary[last_end:])
+    modified_summary = "".join(parts)
+    
+    # Create a summarization example
+    if modified_summary == original_summary:
+        return None
+        
+    return {
+        "lease_id": lease_id,
+        "original_summary": original_summary,
+        "corrected_summary": modified_summary,
+        "feedback_count": len(feedback_list),
+        "timestamp": max(feedback.get("timestamp", "") for feedback in feedback_list)
+    }
+
+
+def _process_lease(lease_job: Tuple[str, List[Dict[str, Any]], Set[str]],
+                   processed_dir: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Build the extraction and summarization examples for one lease (runs in a worker process)"""
+    lease_id, feedback_list, artifacts = lease_job
+    extraction_examples = _extraction_examples_for_lease(lease_id, feedback_list, processed_dir, artifacts)
+    summarization_example = _summarization_example_for_lease(lease_id, feedback_list, processed_dir, artifacts)
+    return extraction_examples, [summarization_example] if summarization_example else []
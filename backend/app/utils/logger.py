@@ -1,37 +1,84 @@
+import atexit
+import functools
 import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from contextvars import ContextVar
 from datetime import datetime
 
 # Create logs directory if it doesn't exist
 logs_dir = os.path.join("app", "logs")
 os.makedirs(logs_dir, exist_ok=True)
 
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Lease currently being processed; bound once per request and attached to every record
+lease_id_var: ContextVar[str] = ContextVar("lease_id", default="-")
+
+
+class LeaseContextFilter(logging.Filter):
+    """Attach the lease ID bound in the current context to each log record"""
+    def filter(self, record):
+        record.lease_id = lease_id_var.get()
+        return True
+
+
 # Configure logger
 logger = logging.getLogger("lease_logik")
 logger.setLevel(logging.INFO)
+logger.addFilter(LeaseContextFilter())
 
 # Create a formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(lease_id)s] - %(message)s')
 
 # Create console handler
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
-# Create file handler
+# Create file handler, rotated so the log cannot grow without bound
 log_file = os.path.join(logs_dir, f"lease_logik_{datetime.now().strftime('%Y%m%d')}.log")
-file_handler = logging.FileHandler(log_file)
+file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+# Callers only enqueue records; a listener thread does the console and file I/O
+log_queue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+logger.addHandler(queue_handler)
+
+listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+
+def _log_directly_in_child():
+    """
+    Forked workers (e.g. process pools) have no listener thread, so write records directly.
+    Each worker gets its own non-rotating log file: sharing the parent's rotating file
+    would have several processes appending to it and each running its own rollover.
+    """
+    child_log_file = os.path.join(logs_dir, f"lease_logik_{datetime.now().strftime('%Y%m%d')}_{os.getpid()}.log")
+    # Delay opening so workers that never log leave no empty file behind
+    child_file_handler = logging.FileHandler(child_log_file, delay=True)
+    child_file_handler.setLevel(logging.INFO)
+    child_file_handler.setFormatter(formatter)
+    
+    logger.removeHandler(queue_handler)
+    logger.addHandler(console_handler)
+    logger.addHandler(child_file_handler)
+
+
+os.register_at_fork(after_in_child=_log_directly_in_child)
 
 def log_function_call(func):
-    """Decorator to log function calls"""
+    """Decorator to log function calls at DEBUG level"""
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger.info(f"Calling function: {func.__name__}")
-        result = func(*args, **kwargs)
-        logger.info(f"Function {func.__name__} completed")
-        return result
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Calling function: %s", func.__name__)
+        return func(*args, **kwargs)
     return wrapper
@@ -6,6 +6,7 @@ This script demonstrates the fully AI-native extraction capabilities.
 
 import asyncio
 import os
+import orjson
 from app.schemas import LeaseType
 from app.core.ai_native_extractor import AILeaseIntelligence
 from app.core.ai_advanced_chunker import AIAdvancedChunker
@@ -17,6 +18,10 @@ from app.core.ai_specialized_extractors import (
 )
 from app.utils.logger import logger
 
+# Shared by both suites so the OpenAI client and its connection pool are reused
+api_key = os.environ.get("OPENAI_API_KEY")
+ai_system = AILeaseIntelligence(api_key) if api_key else None
+
 
 async def test_ai_native_extraction():
     """Test the complete AI-native extraction pipeline"""
@@ -59,9 +64,8 @@ async def test_ai_native_extraction():
     rental herein provided shall be abated until possession is given.
     """
     
-    # Initialize AI system
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
+    # The AI system is initialized at module level
+    if not ai_system:
         logger.error("OpenAI API key not found in environment")
         return
     
@@ -76,43 +80,52 @@ async def test_ai_native_extraction():
     for chunk in chunks[:3]:  # Show first 3
         print(f"   - Chunk: {chunk['clause_hint']} (Confidence: {chunk['confidence']})")
     
+    # The specialized extractors are independent of the pipeline, so start
+    # their API calls now and let them run while the pipeline streams
+    financial_extractor = AIFinancialClauseExtractor()
+    date_extractor = AIDateTimeExtractor()
+    rights_extractor = AIRightsAndOptionsExtractor()
+    rent_section = "BASE RENT: Tenant shall pay base rent as follows:\n- Year 1: $62.50 per rentable square foot annually ($65,104.17 monthly)"
+    
+    specialized = asyncio.gather(
+        financial_extractor.extract_base_rent(rent_section),
+        date_extractor.extract_critical_dates(lease_text),
+        rights_extractor.extract_all_options(lease_text)
+    )
+    
     # Test 2: Complete AI Extraction
     print("\n2. Testing Complete AI Extraction Pipeline...")
-    ai_system = AILeaseIntelligence(api_key)
     
     pdf_content = {
         'text': lease_text,
         'layout_info': {'segments': chunks}
     }
     
-    results = await ai_system.extract_complete_lease_intelligence(
-        pdf_content,
-        LeaseType.OFFICE
-    )
-    
-    print(f"   - Extraction confidence: {results['metadata']['confidence_score']:.2f}")
-    print(f"   - Clauses extracted: {len(results['extracted_clauses'])}")
+    # Report each phase as it finishes instead of waiting for the full result
+    results = {}
+    async for stage in ai_system.stream_extract(pdf_content, LeaseType.OFFICE):
+        results[stage.stage] = stage.data
+        if stage.stage == 'intelligent_chunks':
+            print(f"   - Intelligent chunks created: {len(stage.data)}")
+        elif stage.stage == 'extracted_clauses':
+            print(f"   - Clauses extracted: {len(stage.data)}")
+        elif stage.stage == 'metadata':
+            print(f"   - Extraction confidence: {stage.data['confidence_score']:.2f}")
     
     # Test 3: Specialized AI Extractors
     print("\n3. Testing AI Specialized Extractors...")
     
-    # Financial extraction
-    financial_extractor = AIFinancialClauseExtractor()
-    rent_section = "BASE RENT: Tenant shall pay base rent as follows:\n- Year 1: $62.50 per rentable square foot annually ($65,104.17 monthly)"
+    financial_result, dates_result, rights_result = await specialized
     
-    financial_result = await financial_extractor.extract_base_rent(rent_section)
+    # Financial extraction
     print(f"   - Financial extraction confidence: {financial_result.confidence}")
     print(f"   - Base rent found: {financial_result.extracted_data.get('base_rent_amount')}")
     
     # Date extraction
-    date_extractor = AIDateTimeExtractor()
-    dates_result = await date_extractor.extract_critical_dates(lease_text)
     print(f"   - Date extraction confidence: {dates_result.confidence}")
     print(f"   - Commencement date: {dates_result.extracted_data.get('key_dates', {}).get('lease_commencement')}")
     
     # Rights extraction
-    rights_extractor = AIRightsAndOptionsExtractor()
-    rights_result = await rights_extractor.extract_all_options(lease_text)
     print(f"   - Rights extraction confidence: {rights_result.confidence}")
     print(f"   - Renewal options found: {len(rights_result.extracted_data.get('renewal_options', []))}")
     
@@ -140,7 +153,7 @@ async def test_ai_native_extraction():
     if results['extracted_clauses']:
         first_clause = list(results['extracted_clauses'].items())[0]
         print(f"\nClause: {first_clause[0]}")
-        print(f"Data: {json.dumps(first_clause[1], indent=2)[:500]}...")
+        print(f"Data: {orjson.dumps(first_clause[1], option=orjson.OPT_INDENT_2, default=str).decode()[:500]}...")
 
 
 async def test_edge_cases():
@@ -148,6 +161,10 @@ async def test_edge_cases():
     
     print("\n=== Testing Edge Cases ===\n")
     
+    if not ai_system:
+        logger.error("OpenAI API key not found in environment")
+        return
+    
     # Test with ambiguous language
     ambiguous_text = """
     The tenant may or may not have the option to renew, subject to various 
@@ -155,19 +172,6 @@ async def test_edge_cases():
     specified in writing by either party, notwithstanding any verbal agreements.
     """
     
-    api_key = os.environ.get("OPENAI_API_KEY")
-    ai_system = AILeaseIntelligence(api_key)
-    
-    # Test extraction
-    pdf_content = {'text': ambiguous_text, 'layout_info': {}}
-    results = await ai_system.extract_complete_lease_intelligence(
-        pdf_content,
-        LeaseType.OFFICE
-    )
-    
-    print("1. Ambiguous Language Test:")
-    print(f"   - AI understood the ambiguity: {results['metadata']['confidence_score'] < 0.7}")
-    
     # Test with missing information
     incomplete_text = """
     LEASE AGREEMENT
@@ -178,19 +182,26 @@ async def test_edge_cases():
     Term: ___ years commencing on ______
     """
     
-    pdf_content = {'text': incomplete_text, 'layout_info': {}}
-    results = await ai_system.extract_complete_lease_intelligence(
-        pdf_content,
-        LeaseType.OFFICE
+    # Both documents are independent, so extract them concurrently
+    ambiguous_results, incomplete_results = await asyncio.gather(
+        ai_system.extract_complete_lease_intelligence({'text': ambiguous_text, 'layout_info': {}}, LeaseType.OFFICE),
+        ai_system.extract_complete_lease_intelligence({'text': incomplete_text, 'layout_info': {}}, LeaseType.OFFICE)
     )
     
+    print("1. Ambiguous Language Test:")
+    print(f"   - AI understood the ambiguity: {ambiguous_results['metadata']['confidence_score'] < 0.7}")
+    
     print("\n2. Incomplete Document Test:")
-    print(f"   - Identified missing information: {len(results.get('completeness_report', {}).get('missing_information', [])) > 0}")
+    print(f"   - Identified missing information: {len(incomplete_results.get('completeness_report', {}).get('missing_information', [])) > 0}")
     
     print("\n=== Edge Case Testing Complete ===")
 
 
+async def main():
+    """Run both test suites concurrently on one event loop"""
+    await asyncio.gather(test_ai_native_extraction(), test_edge_cases())
+
+
 if __name__ == "__main__":
     # Run tests
-    asyncio.run(test_ai_native_extraction())
-    asyncio.run(test_edge_cases())
+    asyncio.run(main())
@@ -4,6 +4,10 @@ Test the asyncio fix independently
 """
 
 import asyncio
+import concurrent.futures
+
+# Reused for every in-loop call instead of creating a new pool each time
+_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4)
 
 # Test the same pattern used in chunk_lease
 def test_asyncio_handling():
@@ -15,10 +19,8 @@ def test_asyncio_handling():
         # Check if we're already in an event loop
         loop = asyncio.get_running_loop()
         print("Already in event loop - handling with thread")
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(asyncio.run, async_function())
-            return future.result()
+        future = _POOL.submit(asyncio.run, async_function())
+        return future.result()
     except RuntimeError:
         # No event loop is running - this is the normal case
         print("No event loop - using asyncio.run")
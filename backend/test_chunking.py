@@ -50,11 +50,13 @@ def test_chunking():
         
         print(f"\nSuccessfully created {len(chunks)} chunks:")
         for i, chunk in enumerate(chunks):
+            get = chunk.get
             print(f"\nChunk {i+1}:")
-            print(f"  ID: {chunk.get('chunk_id')}")
-            print(f"  Type: {chunk.get('clause_hint')}")
-            print(f"  Confidence: {chunk.get('confidence')}")
-            print(f"  Content preview: {chunk.get('content', '')[:100]}...")
+            print(f"  ID: {get('chunk_id')}")
+            print(f"  Type: {get('clause_hint')}")
+            print(f"  Confidence: {get('confidence')}")
+            content = get('content') or ''
+            print(f"  Content preview: {content[:100]}...")
             
     except Exception as e:
         print(f"\nError during chunking: {e}")
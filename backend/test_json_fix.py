@@ -8,32 +8,36 @@ import os
 from app.schemas import LeaseType
 from app.core.gpt_extract import call_openai_api
 
-async def test_json_fix():
-    """Test that the JSON format fix works"""
-    
-    # Test prompts without "json" word
-    system_prompt = "You are an expert lease analyst. Extract information from the text."
-    user_prompt = "Extract the tenant name from this text: The tenant is ACME Corp."
-    
-    print("Testing GPT call with prompts that don't contain 'json'...")
-    
+async def _run_case(label: str, system_prompt: str, user_prompt: str):
+    """Call GPT with one prompt pair and report the outcome"""
     try:
         response = await call_openai_api(system_prompt, user_prompt)
-        print(f"Success! Response: {response[:100]}...")
+        return f"{label}\nSuccess! Response: {response[:100]}..."
     except Exception as e:
-        print(f"Error: {e}")
-        
-    # Test prompts with "json" word
-    system_prompt = "You are an expert lease analyst. Return JSON responses."
-    user_prompt = "Extract the tenant name from this text: The tenant is ACME Corp. Return as JSON."
+        return f"{label}\nError: {e}"
+
+async def test_json_fix():
+    """Test that the JSON format fix works"""
     
-    print("\nTesting GPT call with prompts that contain 'json'...")
+    # The two cases must stay separate calls (one prompt pair lacks "json", the other has it),
+    # so issue them concurrently instead of back to back
+    results = await asyncio.gather(
+        # Test prompts without "json" word
+        _run_case(
+            "Testing GPT call with prompts that don't contain 'json'...",
+            "You are an expert lease analyst. Extract information from the text.",
+            "Extract the tenant name from this text: The tenant is ACME Corp."
+        ),
+        # Test prompts with "json" word
+        _run_case(
+            "\nTesting GPT call with prompts that contain 'json'...",
+            "You are an expert lease analyst. Return JSON responses.",
+            "Extract the tenant name from this text: The tenant is ACME Corp. Return as JSON."
+        )
+    )
     
-    try:
-        response = await call_openai_api(system_prompt, user_prompt)
-        print(f"Success! Response: {response[:100]}...")
-    except Exception as e:
-        print(f"Error: {e}")
+    for result in results:
+        print(result)
 
 if __name__ == "__main__":
     asyncio.run(test_json_fix())
@@ -0,0 +1,84 @@
+"""
+Shared pytest fixtures for the backend tests.
+
+The app modules and the OpenAI key are resolved once per session so that
+every collected test module reuses the same warm import graph. Tests run
+against a mocked OpenAI transport by default; tests marked ``live`` hit the
+real API and only run when selected with ``-m live``.
+"""
+
+import os
+import sys
+
+import httpx
+import orjson
+import pytest
+import respx
+
+# Add the parent directory to the Python path to import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def api_key():
+    """OpenAI API key from the environment; skips GPT-backed tests when unset"""
+    key = os.environ.get("OPENAI_API_KEY")
+    if not key:
+        pytest.skip("OPENAI_API_KEY environment variable not set")
+    return key
+
+
+@pytest.fixture(scope="session")
+def chunker_module():
+    """The advanced_chunker module, imported once for the whole session"""
+    from app.core import advanced_chunker
+    return advanced_chunker
+
+
+# Canned clause classification returned for every chat completion in mock mode
+FAKE_EXTRACT_JSON = {
+    "clause_category": "premises",
+    "risk_flags": [{"risk_level": "low", "description": "Standard clause"}],
+    "key_values": {},
+    "confidence": 0.9,
+    "justification": "Mocked response"
+}
+
+FAKE_CHAT_COMPLETION = {
+    "id": "chatcmpl-mock",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4-turbo",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": orjson.dumps(FAKE_EXTRACT_JSON).decode()}
+    }],
+    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "live: calls the real OpenAI API")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip live tests unless they were explicitly selected with -m live"""
+    if "live" in (config.getoption("-m") or ""):
+        return
+    skip_live = pytest.mark.skip(reason="calls the real OpenAI API; run with -m live")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
+
+
+@pytest.fixture
+def mock_openai(monkeypatch):
+    """Route every OpenAI chat completion to FAKE_CHAT_COMPLETION without any HTTP"""
+    if not os.environ.get("OPENAI_API_KEY"):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with respx.mock(base_url="https://api.openai.com", assert_all_called=False) as router:
+        router.post("/v1/chat/completions").mock(
+            return_value=httpx.Response(200, json=FAKE_CHAT_COMPLETION)
+        )
+        yield router
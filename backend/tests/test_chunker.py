@@ -1,21 +1,25 @@
 """
 Test script for the advanced chunking system.
 This script demonstrates and validates the advanced chunking functionality.
-Run this script directly to test the chunking on sample lease text.
+Run this script directly to test the chunking on sample lease text, or
+collect it with pytest to reuse the session fixtures from conftest.py.
 """
 
 import sys
 import os
-import json
+import orjson
+from collections import defaultdict
 from pprint import pprint
 
+import pytest
+
 # Add the parent directory to the Python path to import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.advanced_chunker import chunk_lease
 from app.schemas import LeaseType
 
-def run_chunking_test():
+def run_chunking_test(chunk_fn=chunk_lease):
     """Run a test of the advanced chunking system on a sample lease excerpt"""
     print("Running advanced chunking test...")
     
@@ -108,62 +112,86 @@ def run_chunking_test():
     """
     
     # Run the chunking system
-    chunks = chunk_lease(sample_lease, LeaseType.OFFICE)
+    chunks = chunk_fn(sample_lease, LeaseType.OFFICE)
     
     # Create a debug directory
     debug_dir = "test_output"
     os.makedirs(debug_dir, exist_ok=True)
     
     # Save the chunks to a file for inspection
-    with open(os.path.join(debug_dir, "test_chunks.json"), "w", encoding="utf-8") as f:
-        json.dump(chunks, f, indent=2, default=str)
+    with open(os.path.join(debug_dir, "test_chunks.json"), "wb") as f:
+        f.write(orjson.dumps(chunks, option=orjson.OPT_INDENT_2, default=str))
     
     # Print summary of chunks
     print(f"\nChunking complete! Generated {len(chunks)} chunks:")
     for i, chunk in enumerate(chunks):
+        get = chunk.get
         print(f"\nChunk {i+1} - {chunk['chunk_id']}:")
-        print(f"  Section: {chunk.get('clause_hint', 'undefined')}")
-        print(f"  Pages: {chunk.get('page_start')} - {chunk.get('page_end')}")
-        print(f"  Is Table: {chunk.get('is_table', False)}")
-        print(f"  Token Estimate: {chunk.get('token_estimate', 0)}")
-        print(f"  Parent Heading: {chunk.get('parent_heading', 'None')}")
-        content_preview = chunk.get('content', '')[:50].replace('\n', ' ')
+        print(f"  Section: {get('clause_hint', 'undefined')}")
+        print(f"  Pages: {get('page_start')} - {get('page_end')}")
+        print(f"  Is Table: {get('is_table', False)}")
+        print(f"  Token Estimate: {get('token_estimate', 0)}")
+        print(f"  Parent Heading: {get('parent_heading', 'None')}")
+        content_preview = (get('content') or '')[:50].replace('\n', ' ')
         print(f"  Content: {content_preview}...")
 
     print(f"\nDetailed results saved to {os.path.abspath(os.path.join(debug_dir, 'test_chunks.json'))}")
     return chunks
 
-if __name__ == "__main__":
-    # Run the test
-    chunks = run_chunking_test()
-    
-    # Analyze the results
-    total_tokens = sum(chunk.get('token_estimate', 0) for chunk in chunks)
-    tables = [chunk for chunk in chunks if chunk.get('is_table', False)]
+def analyze_chunks(chunks):
+    """Print token, table and clause coverage statistics for a chunk list"""
+    # Analyze the results in a single pass: token total, tables, clause
+    # coverage and oversized chunks
+    total_tokens = 0
+    tables = []
+    large_chunks = []
+    clauses = defaultdict(int)
+    for chunk in chunks:
+        token_estimate = chunk.get('token_estimate', 0)
+        total_tokens += token_estimate
+        if chunk.get('is_table', False):
+            tables.append(chunk)
+        if token_estimate > 1000:
+            large_chunks.append(chunk)
+        clauses[chunk.get('clause_hint', 'undefined')] += 1
     
     print("\n=== ANALYSIS ===")
     print(f"Total chunks: {len(chunks)}")
     print(f"Total estimated tokens: {total_tokens}")
     print(f"Tables found: {len(tables)}")
     
-    # Check clause coverage
-    clauses = {}
-    for chunk in chunks:
-        clause = chunk.get('clause_hint', 'undefined')
-        if clause in clauses:
-            clauses[clause] += 1
-        else:
-            clauses[clause] = 1
-    
     print("\nClause coverage:")
     for clause, count in clauses.items():
         print(f"  {clause}: {count} chunk(s)")
     
     # Check for any chunks that might be too large
-    large_chunks = [chunk for chunk in chunks if chunk.get('token_estimate', 0) > 1000]
     if large_chunks:
         print(f"\nWARNING: {len(large_chunks)} chunks exceed 1000 tokens:")
         for chunk in large_chunks:
             print(f"  {chunk['chunk_id']}: {chunk.get('token_estimate')} tokens, {chunk.get('clause_hint')} clause")
     else:
         print("\nGood! No chunks exceed 1000 tokens.")
+    return large_chunks
+
+def test_advanced_chunking(mock_openai, chunker_module, tmp_path, monkeypatch):
+    # The chunker and run_chunking_test write debug output relative to the
+    # working directory; keep it out of the source tree
+    monkeypatch.chdir(tmp_path)
+    chunks = run_chunking_test(chunker_module.chunk_lease)
+    assert chunks
+    assert all('chunk_id' in chunk for chunk in chunks)
+    assert mock_openai.calls.call_count > 0
+    analyze_chunks(chunks)
+
+@pytest.mark.live
+def test_advanced_chunking_live(api_key, chunker_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chunks = run_chunking_test(chunker_module.chunk_lease)
+    assert chunks
+    assert all('chunk_id' in chunk for chunk in chunks)
+    analyze_chunks(chunks)
+
+if __name__ == "__main__":
+    # Run the test
+    chunks = run_chunking_test()
+    analyze_chunks(chunks)